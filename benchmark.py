@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark for BNEWS render pipeline
+===================================
+
+Times the main processing stages with synthetic Pelican-like article sets and micro news sources,
+and reports per-stage throughput and peak memory. Plugin import time is measured in fresh interpreters,
+as it is paid on every `pelican` invocation.
+
+Usage:
+
+    python benchmark.py
+    python benchmark.py --articles 1000 10000 100000 --micro-news 100 10000 --json bench.json
+
+"""
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import datetime
+import tempfile
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bnews
+
+CATEGORIES = ['news', 'research', 'teaching', 'events', 'misc']
+
+# Dependencies which should be loaded only when a feature needs them
+LAZY_MODULES = ['bs4', 'jinja2', 'babel', 'yaml']
+
+IMPORT_SCRIPT = '''
+import sys, json, time, tracemalloc
+sys.path.insert(0, {path!r})
+import pelican
+before = set(sys.modules)
+if {trace!r}:
+    tracemalloc.start()
+start = time.perf_counter()
+import bnews
+elapsed = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({{'elapsed': elapsed, 'peak': peak, 'modules': sorted(set(sys.modules) - before)}}))
+'''
+
+
+class Category(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class Article(object):
+    """
+    Minimal stand-in for pelican.contents.Article
+    """
+
+    def __init__(self, article_id):
+        self.title = 'Article ' + str(article_id)
+        self.date = datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=article_id)
+        self.url = 'article-' + str(article_id) + '.html'
+        self.category = Category(CATEGORIES[article_id % len(CATEGORIES)])
+        self.source_path = __file__
+        self.metadata = {}
+        self._content = '<p>' + ' '.join(['Article body text'] * 50) + '</p>'
+        self.summary = '<p>Summary of article ' + str(article_id) + '</p>'
+
+
+class Content(object):
+    """
+    Minimal stand-in for pelican.contents.Page
+    """
+
+    def __init__(self, html, metadata=None):
+        self.title = 'Page'
+        self._content = html
+        self.metadata = metadata or {}
+        self.metadata.setdefault('scripts', [])
+        self.metadata.setdefault('styles', [])
+
+
+def generate_articles(count):
+    """
+    Generate synthetic article set, newest first like in Pelican
+    :param count: article count
+    :return: list of Article
+    """
+
+    return [Article(article_id) for article_id in reversed(range(count))]
+
+
+def generate_micro_news(path, count):
+    """
+    Generate synthetic micro news yaml or json lines file
+    :param path: file path, `.jsonl` files are written as json lines
+    :param count: entry count
+    """
+
+    with open(path, 'w') as micro_news_file:
+        if not path.endswith('.jsonl'):
+            micro_news_file.write('data:\n')
+
+        for entry_id in range(count):
+            date = datetime.datetime(2010, 1, 1) + datetime.timedelta(hours=(entry_id * 7919) % count)
+            entry = {
+                'title': 'Micro news ' + str(entry_id),
+                'date': date.strftime('%Y-%m-%d %H:%M:%S'),
+                'summary': 'Some text for entry ' + str(entry_id),
+                'url': 'http://example.com/' + str(entry_id),
+                'category': CATEGORIES[entry_id % len(CATEGORIES)]
+            }
+
+            if path.endswith('.jsonl'):
+                micro_news_file.write(json.dumps(entry) + '\n')
+
+            else:
+                micro_news_file.write(
+                    '  - title: ' + entry['title'] + '\n'
+                    '    date: ' + entry['date'] + '\n'
+                    '    summary: ' + entry['summary'] + '\n'
+                    '    url: ' + entry['url'] + '\n'
+                    '    category: ' + entry['category'] + '\n'
+                )
+
+
+def init_plugin(settings=None):
+    """
+    Initialize plugin settings as Pelican would
+    :param settings: extra pelican settings
+    """
+
+    pelican_settings = {'SITEURL': 'http://example.com', 'CACHE_PATH': tempfile.gettempdir()}
+    pelican_settings.update(settings or {})
+    bnews.init_default_config(types.SimpleNamespace(settings=pelican_settings))
+
+
+def measure(name, func, repeat):
+    """
+    Run function repeatedly and measure time, peak memory is measured from a separate run
+    :param name: stage name
+    :param func: function to run
+    :param repeat: repeat count
+    :return: dict
+    """
+
+    # Warm up, e.g. template compilation
+    func()
+
+    start = time.perf_counter()
+    for iteration in range(repeat):
+        func()
+
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'stage': name,
+        'repeat': repeat,
+        'total_s': elapsed,
+        'per_call_ms': elapsed / repeat * 1000.0,
+        'per_s': repeat / elapsed if elapsed else float('inf'),
+        'peak_kb': peak / 1024.0
+    }
+
+
+def benchmark_articles(article_count, repeat):
+    """
+    Benchmark listing rendering stages for article set
+    :param article_count: article count
+    :param repeat: repeat count
+    :return: list of results
+    """
+
+    results = []
+    init_plugin({'BNEWS_LISTING_CACHE_SIZE': 0})
+    bnews.set_articles(generate_articles(article_count))
+
+    page = '<p>' + ' '.join(['Page text'] * 200) + '</p>\n'
+    for mode in ['panel', 'list']:
+        settings = bnews.get_content_settings({'bnews_mode': mode})
+        listing_settings = settings.new_child({'show-categories': True, 'show-summary': mode == 'list'})
+        filtered_settings = listing_settings.new_child({'category': ['events']})
+        record = bnews.bnews_listings['records'][0]
+        div = '<div class="bnews" data-mode="' + mode + '" data-count="5" data-show-categories="True"></div>'
+
+        for name, func in [
+            ('generate_item', lambda: bnews.generate_item(article=record, settings=listing_settings)),
+            ('generate_listing', lambda: bnews.generate_listing(settings=listing_settings)),
+            ('generate_listing/category', lambda: bnews.generate_listing(settings=filtered_settings)),
+            ('bnews/no-markers', lambda: bnews.bnews(Content(page))),
+            ('bnews/div', lambda: bnews.bnews(Content(page + div + page))),
+        ]:
+            result = measure(name, func, repeat)
+            result.update({'articles': article_count, 'mode': mode})
+            results.append(result)
+
+    return results
+
+
+def benchmark_content_cache(article_count, page_count, tmp_dir):
+    """
+    Benchmark full build passes over pages with two listings each, without content cache, with cold cache and
+    with warm cache from the previous build
+    :param article_count: article count
+    :param page_count: page count
+    :param tmp_dir: temporary directory
+    :return: list of results
+    """
+
+    articles = generate_articles(article_count)
+    body = '<p>' + ' '.join(['Page <em>text</em> with <a href="#">markup</a>'] * 400) + '</p>\n'
+    sidebars = (
+        '<div class="bnews" data-mode="panel" data-count="5" data-show-categories="True"></div>'
+        '<div class="bnews" data-mode="list" data-count="3" data-category="events" data-show-summary="True"></div>'
+    )
+    pages = [body + '<p>Page ' + str(page_id) + '</p>' + sidebars for page_id in range(page_count)]
+
+    def build():
+        bnews.set_articles(articles)
+        start = time.perf_counter()
+        for page in pages:
+            bnews.bnews(Content(page))
+
+        bnews.save_content_cache()
+        return time.perf_counter() - start
+
+    results = []
+    for name, settings, passes in [
+        ('build', {}, 1),
+        ('build/content-cache-cold', {'BNEWS_CONTENT_CACHE': True}, 1),
+        ('build/content-cache-warm', {'BNEWS_CONTENT_CACHE': True}, 2),
+    ]:
+        cache_path = os.path.join(tmp_dir, 'content-cache-' + str(article_count) + '-' + str(page_count))
+        if os.path.isdir(cache_path):
+            shutil.rmtree(cache_path)
+
+        settings.update({'CACHE_PATH': cache_path})
+        init_plugin(settings)
+
+        # Warm cache is measured from the last pass
+        for iteration in range(passes):
+            elapsed = build()
+
+        results.append({
+            'stage': name,
+            'repeat': page_count,
+            'total_s': elapsed,
+            'per_call_ms': elapsed / page_count * 1000.0,
+            'per_s': page_count / elapsed if elapsed else float('inf'),
+            'peak_kb': 0.0,
+            'articles': article_count
+        })
+
+    return results
+
+
+def benchmark_micro_news(entry_count, repeat, tmp_dir):
+    """
+    Benchmark micro news loading
+    :param entry_count: micro news entry count
+    :param repeat: repeat count
+    :param tmp_dir: temporary directory
+    :return: list of results
+    """
+
+    results = []
+    source = os.path.join(tmp_dir, 'micro_news_' + str(entry_count) + '.yaml')
+    generate_micro_news(source, entry_count)
+    source_jsonl = os.path.join(tmp_dir, 'micro_news_' + str(entry_count) + '.jsonl')
+    generate_micro_news(source_jsonl, entry_count)
+    init_plugin()
+
+    def load(path=source, **kwargs):
+        # Measure parsing, not the source cache
+        bnews.bnews_micro_news['sources'] = {}
+        bnews.load_micro_news(path, **kwargs)
+
+    def load_listings():
+        # Listings with different counts and categories within one deferred pass
+        bnews.bnews_micro_news['sources'] = {}
+        bnews.bnews_micro_news['stream-limit'] = 10
+        for count, categories in [(5, None), (3, frozenset(['news'])), (10, frozenset(['research', 'events']))]:
+            bnews.load_micro_news(source, limit=count, categories=categories)
+
+    for name, func in [
+        ('load_micro_news', lambda: load()),
+        ('load_micro_news/streaming', lambda: load(limit=5)),
+        ('load_micro_news/streaming-listings', load_listings),
+        ('load_micro_news/streaming-jsonl', lambda: load(source_jsonl, limit=5)),
+        ('load_micro_news/cached', lambda: bnews.load_micro_news(source)),
+    ]:
+        result = measure(name, func, repeat)
+        result.update({'micro_news': entry_count})
+        results.append(result)
+
+    return results
+
+
+def benchmark_import(repeat):
+    """
+    Benchmark plugin import in fresh interpreters, Pelican itself is imported before timing.
+    Peak memory is measured from a separate run.
+    :param repeat: repeat count
+    :return: list of results
+    """
+
+    def run(trace):
+        script = IMPORT_SCRIPT.format(path=os.path.dirname(os.path.abspath(__file__)), trace=trace)
+        output = subprocess.check_output([sys.executable, '-c', script])
+        return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+    runs = [run(trace=False) for iteration in range(repeat)]
+    peak = run(trace=True)['peak']
+
+    elapsed = sorted(run['elapsed'] for run in runs)[len(runs) // 2]
+    loaded = sorted(set(
+        module.split('.')[0] for run in runs for module in run['modules'] if module.split('.')[0] in LAZY_MODULES
+    ))
+
+    return [{
+        'stage': 'import bnews',
+        'repeat': repeat,
+        'total_s': sum(run['elapsed'] for run in runs),
+        'per_call_ms': elapsed * 1000.0,
+        'per_s': 1.0 / elapsed if elapsed else float('inf'),
+        'peak_kb': peak / 1024.0,
+        'lazy_modules_loaded': loaded
+    }]
+
+
+def print_results(results):
+    """
+    Print result table
+    :param results: list of results
+    """
+
+    print('{:<28} {:>8} {:>8} {:>8} {:>12} {:>12} {:>12}'.format(
+        'stage', 'size', 'mode', 'repeat', 'ms/call', 'calls/s', 'peak kB'
+    ))
+    for result in results:
+        print('{:<28} {:>8} {:>8} {:>8} {:>12.3f} {:>12.1f} {:>12.1f}'.format(
+            result['stage'],
+            result.get('articles', result.get('micro_news', '')),
+            result.get('mode', ''),
+            result['repeat'],
+            result['per_call_ms'],
+            result['per_s'],
+            result['peak_kb']
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pelican-bnews render pipeline')
+    parser.add_argument('--articles', type=int, nargs='+', default=[1000, 10000, 100000], help='article set sizes')
+    parser.add_argument('--micro-news', type=int, nargs='+', default=[100, 1000, 10000], help='micro news source sizes')
+    parser.add_argument('--pages', type=int, default=2000, help='page count for build passes')
+    parser.add_argument('--repeat', type=int, default=20, help='repeat count per stage')
+    parser.add_argument('--json', help='write results into json file')
+    args = parser.parse_args(argv)
+
+    results = benchmark_import(min(args.repeat, 10))
+    for article_count in args.articles:
+        results += benchmark_articles(article_count, args.repeat)
+
+    tmp_dir = tempfile.mkdtemp(prefix='bnews-benchmark-')
+    try:
+        for article_count in args.articles:
+            results += benchmark_content_cache(article_count, args.pages, tmp_dir)
+
+        for entry_count in args.micro_news:
+            results += benchmark_micro_news(entry_count, args.repeat, tmp_dir)
+
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print_results(results)
+
+    if results[0]['lazy_modules_loaded']:
+        print('Modules loaded on plugin import: ' + ', '.join(results[0]['lazy_modules_loaded']))
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,19 +11,27 @@ import os
 import shutil
 import logging
 import copy
-import yaml
 import time
 import collections
-from bs4 import BeautifulSoup
-from jinja2 import Template
-from pelican import signals, contents
+import functools
+import types
+import hashlib
+import re
+import json
+import pickle
+import heapq
+import itertools
+from html.parser import HTMLParser
+from pelican import signals
 import datetime
-from babel.dates import format_timedelta
 from io import open
 
 logger = logging.getLogger(__name__)
 __version__ = '0.1.0'
 
+html_tag_pattern = re.compile(r'<[^>]*>')
+count_attribute_pattern = re.compile(r'data-count\s*=\s*["\']?\s*(\d+)')
+
 bnews_default_settings = {
     'header': 'News',
     'header-link': 'news',
@@ -53,7 +61,7 @@ bnews_default_settings = {
                 <div class="col-md-12 col-sm-12"><h5 class="list-group-item-heading">{{article_title}}</h5></div>
                 <div class="col-md-12 col-sm-12">
                 <p class="list-group-item-text text-muted">{{article_category}}
-                {% if article_date %}<small><span class="bnews-time" datetime="{{article_date}}"></span><small>{% endif %}
+                {% if article_date %}<small><span class="bnews-time" datetime="{{article_date}}"{% if article_date_relative %} data-bnews-relative{% endif %}>{{article_date_text}}</span></small>{% endif %}
                 </p>
                 </div>
             </div>
@@ -65,7 +73,7 @@ bnews_default_settings = {
                 <div class="col-md-12 col-sm-12">
                     <h4 class="list-group-item-heading">
                     {% if article_date and not article_category%}
-                    <span class="bnews-time pull-right text-muted" datetime="{{article_date}}"></span>
+                    <span class="bnews-time pull-right text-muted" datetime="{{article_date}}"{% if article_date_relative %} data-bnews-relative{% endif %}>{{article_date_text}}</span>
                     {% endif %}
                     {{article_title}}
                     </h4>
@@ -74,7 +82,7 @@ bnews_default_settings = {
                 <p class="list-group-item-text text-muted">
                 {{article_category}}
                 {% if article_category and article_date %}
-                <span class="bnews-time pull-right" datetime="{{article_date}}"></span>
+                <span class="bnews-time pull-right" datetime="{{article_date}}"{% if article_date_relative %} data-bnews-relative{% endif %}>{{article_date_text}}</span>
                 {% endif %}
                 </p>
                 </div>
@@ -93,14 +101,182 @@ bnews_default_settings = {
     'shorten-category-label': True,
     'category-label-css': {},
     'show-summary': False,
+    'summary-max-chars': None,
     'site-url': '',
     'template-variable': False,
     'articles': None,
+    'include-articles': True,
+    'prescan': True,
+    'template-bytecode-cache': None,
+    'normalize-html': False,
+    'listing-cache-size': 128,
+    'micro-news-cache': None,
+    'micro-news-streaming': False,
+    'link-resources': False,
+    'content-cache': None,
+    'processes': 1,
+    'deferred': False,
+    'fragments': False,
+    'json-feed': False,
+    'inline-script': False,
+    'bundle': False,
+    'precompress': None,
+    'date-format': None,
+    'date-locale': 'en',
+    'date-script': True,
+    'profile': False,
+    'profile-report': None,
     'debug_processing': False
 }
 
 bnews_settings = copy.deepcopy(bnews_default_settings)
 
+bnews_templates = {
+    'environment': None,
+    'sources': {},
+    'compiled': {}
+}
+
+bnews_listings = {
+    'version': 0,
+    'articles': None,
+    'records': [],
+    'category-index': {},
+    'date-ordered': True,
+    'cache': collections.OrderedDict(),
+    'fingerprints': {}
+}
+
+bnews_micro_news = {
+    'loader': None,
+    'stream-loader': None,
+    'stream-limit': 0,
+    'sources': {},
+    'sidecar-loaded': False,
+    'modified': False
+}
+
+bnews_content_cache = {
+    'entries': {},
+    'used': {},
+    'loaded': False,
+    'settings-key': None
+}
+
+# Server side date formatting, reference time is fixed for the whole build
+bnews_dates = {
+    'now': datetime.datetime.now(),
+    'locales': {},
+    'formatted': {}
+}
+
+# Script sources for inlining, by file name
+bnews_inline_scripts = {}
+
+# Asset manifest, include tags and bundles are computed once per build after minified files are generated
+bnews_assets = {
+    'plugin-paths': [],
+    'prepared': False,
+    'includes': {},
+    'bundles': {}
+}
+
+# Rendered template variable listings, by fragment id
+bnews_fragments = {}
+
+# Listings published as json feeds, by feed id
+bnews_feeds = {}
+
+# Content waiting for parallel rendering
+bnews_pending = []
+
+bnews_profile = {
+    'stages': {},
+    'contents': []
+}
+
+bnews_stats = {
+    'processed': 0,
+    'skipped': 0,
+    'listing_cache_hits': 0,
+    'listing_cache_misses': 0,
+    'content_cache_hits': 0,
+    'content_cache_misses': 0
+}
+
+
+class ProfileTimer(object):
+    """
+    Accumulate time spent in a processing stage
+    """
+
+    __slots__ = ('stage', 'start', 'elapsed')
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.start = None
+        self.elapsed = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self.start
+        stage = bnews_profile['stages'].setdefault(self.stage, [0, 0.0])
+        stage[0] += 1
+        stage[1] += self.elapsed
+
+
+class NullTimer(object):
+    """
+    Timer used when profiling is disabled
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+null_timer = NullTimer()
+
+
+def profile(stage):
+    """
+    Get timer for processing stage
+    :param stage: stage name
+    :return: context manager
+    """
+
+    if bnews_settings['profile']:
+        return ProfileTimer(stage)
+
+    return null_timer
+
+
+def profiled(stage):
+    """
+    Decorator to time function as processing stage
+    :param stage: stage name
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not bnews_settings['profile']:
+                return func(*args, **kwargs)
+
+            with ProfileTimer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
 
 def boolean(value):
     """Conversion for yes/no True/False."""
@@ -133,526 +309,2338 @@ def get_attribute(attrs, name, default=None):
         return default
 
 
-def generate_listing(settings):
-    count = 0
-    html = "\n"
+class ArticleRecord(object):
+    """
+    Article or micro news entry prepared for listing rendering, all fields used in rendering are computed once.
+    Summary of pelican article is read only when first needed.
+    """
 
-    for article_id, article in enumerate(settings['articles']):
-        if count < settings['count']:
-            if settings['category']:
-                if hasattr(article, 'category'):
-                    category = article.category.name
+    __slots__ = (
+        'title', 'date', 'date_text', 'sort_date', 'url', 'url_target', 'category',
+        'category_label', 'category_label_short', 'source_path', '_summary', '_summaries', '_summary_source',
+        '_article'
+    )
+
+    def __init__(self, article, site_url='', category_label_css=None):
+        if isinstance(article, dict):
+            self.title = article.get('title')
+            self.date = article.get('date')
+            self.category = article.get('category')
+            self.source_path = None
+            self._summary = article.get('summary')
+            self._summaries = {}
+            self._summary_source = None
+            self._article = None
+            url = article.get('url')
 
-                elif 'category' in article:
-                    category = article['category']
+        else:
+            self.title = article.title
+            self.date = datetime.datetime(
+                year=article.date.year,
+                day=article.date.day,
+                month=article.date.month,
+                hour=article.date.hour,
+                minute=article.date.minute
+            )
+            self.category = article.category.name
+            self.source_path = article.source_path
+            self._summary = None
+            self._summaries = {}
+            self._summary_source = None
+            self._article = article
+            url = article.url
 
-                if category in settings['category']:
-                    html += generate_item(
-                        article=article,
-                        settings=settings
-                    ) + "\n"
+        self.date_text = str(self.date) if self.date else self.date
+        self.sort_date = get_sort_date(self.date)
 
-                    count += 1
+        if not url:
+            url = 'javascript:void(0)'
 
-            else:
-                html += generate_item(
-                    article=article,
-                    settings=settings
-                ) + "\n"
+        if 'javascript' in url:
+            self.url = url
+            self.url_target = '_self'
 
-                count += 1
+        elif 'http://' in url or 'https://' in url:
+            self.url = url
+            self.url_target = '_blank'
 
         else:
-            break
+            self.url = site_url + '/' + url
+            self.url_target = '_self'
 
-    html += "\n"
+        if self.category:
+            category_label_css = category_label_css or {}
+            if self.category.lower() in category_label_css:
+                label = '<span class="' + category_label_css[self.category.lower()]['label-css'] + '">'
 
-    if count:
-        template = Template(settings['template'][settings['mode']].strip('\t\r\n').replace('&gt;', '>').replace('&lt;', '<'))
-        div_html = BeautifulSoup(template.render(
-            news_list=html,
-            header=settings['header'],
-            site_url=settings['site-url'],
-            header_link=settings['header-link'],
-            panel_color=settings['panel-color']), "html.parser"
-        )
+            else:
+                label = '<span class="label label-default">'
 
-        return div_html
-    else:
-        return ''
+            self.category_label = label + self.category + '</span>'
+            self.category_label_short = label + self.category[:1].upper() + '</span>'
 
+        else:
+            self.category_label = ''
+            self.category_label_short = ''
 
-def generate_item(article, settings):
-    if hasattr(article, 'date'):
-        article_datetime = datetime.datetime(
-            year=article.date.year,
-            day=article.date.day,
-            month=article.date.month,
-            hour=article.date.hour,
-            minute=article.date.minute
-        )
-    else:
-        article_datetime = article['date']
+    @property
+    def summary(self):
+        if self._article is not None:
+            self._summary = self._article.summary
+            self._article = None
 
-    if settings['show-categories']:
-        if hasattr(article, 'category'):
-            label = article.category.name
+        elif self._summary_source is not None:
+            # Unpickled record, summary is built from the article content like Pelican does
+            self._summary = build_summary(*self._summary_source)
+            self._summary_source = None
 
-        elif 'category' in article:
-            label = article['category']
+        return self._summary
 
-        if label.lower() in settings['category-label-css']:
-            article_category = '<span class="'+settings['category-label-css'][label.lower()]['label-css']+'">'
+    def get_summary(self, max_chars=None):
+        """
+        Get summary, truncated summaries are computed once per length
+        :param max_chars: maximum summary length in characters, None for the full summary
+        :return: str
+        """
 
-        else:
-            article_category = '<span class="label label-default">'
+        if not max_chars:
+            return self.summary
 
-        if settings['shorten-category-label']:
-            article_category += label[:1].upper()
+        if max_chars not in self._summaries:
+            if self._article is not None:
+                # Avoid full summary processing, truncate from the raw text
+                text = self._article.metadata.get('summary') or self._article._content
 
-        else:
-            article_category += label
+            elif self._summary_source is not None:
+                text = self._summary_source[0]
 
-        article_category += '</span>'
+            else:
+                text = self._summary
 
-    else:
-        article_category = ''
+            self._summaries[max_chars] = truncate_text(text, max_chars)
 
-    if settings['show-summary']:
-        if hasattr(article, 'summary'):
-            article_summary = article.summary
+        return self._summaries[max_chars]
 
-        elif 'summary' in article:
-            article_summary = article['summary']
+    def get_summary_source(self):
+        """
+        Get unprocessed summary of the pelican article
+        :return: tuple of summary metadata and summary source, one of them is None
+        """
 
-    else:
-        article_summary = None
+        if 'summary' in self._article.metadata:
+            return self._article.metadata['summary'], None
 
-    if hasattr(article, 'url'):
-        article_url = article.url
+        return None, (
+            self._article.content,
+            self._article.settings.get('SUMMARY_MAX_LENGTH'),
+            self._article.settings.get('SUMMARY_END_SUFFIX', u'\u2026'),
+            self._article.settings.get('SUMMARY_MAX_PARAGRAPHS')
+        )
 
-    elif 'url' in article:
-        article_url = article['url']
+    def detach(self):
+        """
+        Keep unprocessed summary and drop the pelican article, summary is not affected by later content changes
+        """
 
-    else:
-        article_url = 'javascript:void(0)'
+        if self._article is not None:
+            self._summary, self._summary_source = self.get_summary_source()
+            self._article = None
 
-    if article_url and 'javascript' in article_url:
-        article_url_target = '_self'
+    def __getstate__(self):
+        # Pelican article is not pickled, summary is kept unprocessed and built only when needed
+        state = dict((field, getattr(self, field)) for field in self.__slots__[:-1])
+        if self._article is not None:
+            state['_summary'], state['_summary_source'] = self.get_summary_source()
 
-    elif article_url and 'http://' in article_url:
-        article_url_target = '_blank'
+        return state
 
-    elif article_url and 'https://' in article_url:
-        article_url_target = '_blank'
+    def __setstate__(self, state):
+        # Stored by field name, cache files written by other plugin versions fail to load instead of shifting fields
+        for field in self.__slots__[:-1]:
+            setattr(self, field, state[field])
 
-    else:
-        article_url = settings['site-url'] + '/' + article_url
-        article_url_target = '_self'
+        self._article = None
 
-    if hasattr(article, 'title'):
-        article_title = article.title
 
-    elif 'title' in article:
-        article_title = article['title']
+def build_summary(content, max_length, end_suffix, max_paragraphs):
+    """
+    Build article summary from the article content as Pelican does
+    :param content: article content
+    :param max_length: maximum summary length in words, None for the full content
+    :param end_suffix: suffix for truncated summary
+    :param max_paragraphs: maximum summary length in paragraphs
+    :return: str
+    """
 
-    else:
-        article_title = None
+    from pelican import utils
 
-    template = Template(settings['item-template'][settings['mode']].strip('\t\r\n').replace('&gt;', '>').replace('&lt;', '<'))
-    html = BeautifulSoup(template.render(
-        site_url=settings['site-url'],
-        article_url=article_url,
-        article_url_target=article_url_target,
-        article_title=article_title,
-        article_date=article_datetime,
-        article_category=article_category,
-        article_summary=article_summary
-    ), "html.parser")
+    if max_paragraphs is not None and hasattr(utils, 'truncate_html_paragraphs'):
+        content = utils.truncate_html_paragraphs(content, max_paragraphs)
 
-    return html.decode()
+    if max_length is not None:
+        content = utils.truncate_html_words(content, max_length, end_suffix)
 
+    if hasattr(utils, 'strip_toc_elements_from_html'):
+        content = utils.strip_toc_elements_from_html(content)
 
-def load_micro_news(source):
+    return content
 
-    if source and os.path.isfile(source):
-        try:
-            from distutils.version import LooseVersion
-            if LooseVersion(str(yaml.__version__)) >= "5.1":
-                with open(source, 'r', encoding='utf-8') as field:
-                    micro_news_registry = yaml.load(field, Loader=yaml.FullLoader)
-            else:
-                with open(source, 'r', encoding='utf-8') as field:
-                    micro_news_registry = yaml.load(field)
 
-            if 'data' in micro_news_registry:
-                micro_news_registry = micro_news_registry['data']
+def get_sort_date(date):
+    """
+    Get naive datetime for ordering entries from different sources
+    :param date: datetime, date or date string
+    :return: datetime.datetime
+    """
 
-            # Sort based on date
-            micro_news_registry = sorted(micro_news_registry, key=lambda d: d['date'], reverse=True)
+    if isinstance(date, datetime.datetime):
+        return date.replace(tzinfo=None)
 
-            return micro_news_registry
+    if isinstance(date, datetime.date):
+        return datetime.datetime(year=date.year, month=date.month, day=date.day)
 
-        except ValueError:
-            logger.warn('`pelican-bnews` failed to load file [' + str(source) + ']')
-            return False
+    if isinstance(date, str):
+        for date_format in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d']:
+            try:
+                return datetime.datetime.strptime(date, date_format)
 
-    else:
-        logger.warn('`pelican-bnews` failed to load file [' + str(source) + ']')
-        return False
+            except ValueError:
+                pass
 
+    return datetime.datetime.min
 
-def bnews(content):
-    """
-    Main processing
 
+def truncate_text(html, max_chars):
+    """
+    Get plain text prefix of html, only the beginning of the html is processed
+    :param html: html or plain text
+    :param max_chars: maximum length in characters
+    :return: str
     """
 
-    if isinstance(content, contents.Static):
-        return
+    if not html:
+        return html
 
-    soup = BeautifulSoup(content._content, 'html.parser')
+    window = max_chars * 4
+    while True:
+        text = html_tag_pattern.sub(' ', html[:window])
+        if window < len(html):
+            # Drop tag cut at the window boundary
+            text = text.rsplit('<', 1)[0]
 
-    if bnews_settings['template-variable']:
-        # We have page variable set
-        bnews_settings['show'] = True
-        div_html = generate_listing(settings=bnews_settings)
+        text = ' '.join(text.split())
+        if len(text) > max_chars or window >= len(html):
+            break
 
-        if div_html:
-            content.bnews = div_html.decode()
-        else:
-            content.bnews = None
+        window *= 2
 
-    else:
-        content.bnews = None
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(' ', 1)[0] + u'\u2026'
 
-    bnews_divs = soup.find_all('div', class_='bnews')
-    bnews_micro_divs = soup.find_all('div', class_='bnews-micro')
+    return text
 
-    if bnews_divs:
-        if bnews_settings['debug_processing']:
-            logger.debug(msg='[{plugin_name}] title:[{title}] divs:[{div_count}]'.format(
-                plugin_name='bnews',
-                title=content.title,
-                div_count=len(bnews_divs)
-            ))
 
-        # We have divs
-        bnews_settings['show'] = True
-        for bnews_div in bnews_divs:
-            settings = copy.deepcopy(bnews_settings)
-            settings['mode'] = get_attribute(bnews_div.attrs, 'mode', bnews_settings['mode'])
-            settings['header'] = get_attribute(bnews_div.attrs, 'header', bnews_settings['header'])
-            settings['header-link'] = get_attribute(bnews_div.attrs, 'header-link', bnews_settings['header-link'])
-            settings['category'] = get_attribute(bnews_div.attrs, 'category', bnews_settings['category'])
+def format_date(date, settings):
+    """
+    Format date into human readable text at build time, formatted dates are cached per locale
+    :param date: date
+    :param settings: settings mapping
+    :return: str
+    """
 
-            if settings['category']:
-                settings['category'] = settings['category'].split(',')
+    date_format = settings['date-format']
+    if not date_format or not date:
+        return ''
 
-            settings['shorten-category-label'] = boolean(
-                get_attribute(bnews_div.attrs, 'shorten-category-label', bnews_settings['shorten-category-label'])
-            )
+    key = (date_format, settings['date-locale'], date)
+    if key not in bnews_dates['formatted']:
+        from babel.dates import format_timedelta, format_datetime
 
-            settings['count'] = get_attribute(bnews_div.attrs, 'count', bnews_settings['count'])
-            if settings['count']:
-                settings['count'] = int(settings['count'])
+        if settings['date-locale'] not in bnews_dates['locales']:
+            bnews_dates['locales'][settings['date-locale']] = get_locale(settings['date-locale'])
 
-            settings['panel-color'] = get_attribute(bnews_div.attrs, 'panel-color', bnews_settings['panel-color'])
-            settings['show-categories'] = get_attribute(bnews_div.attrs, 'show-categories', bnews_settings['show-categories']) == 'True'
-            settings['show-summary'] = get_attribute(bnews_div.attrs, 'show-summary', bnews_settings['show-summary']) == 'True'
+        locale = bnews_dates['locales'][settings['date-locale']]
 
-            div_html = generate_listing(settings=settings)
-            bnews_div.replaceWith(div_html)
+        if isinstance(date, str):
+            try:
+                date = datetime.datetime.strptime(date, '%Y-%m-%d %H:%M:%S')
 
-    if bnews_micro_divs:
-        if bnews_settings['debug_processing']:
-            logger.debug(msg='[{plugin_name}] title:[{title}] divs:[{div_count}]'.format(
-                plugin_name='bnews-micro',
-                title=content.title,
-                div_count=len(bnews_micro_divs)
-            ))
+            except ValueError:
+                bnews_dates['formatted'][key] = ''
+                return ''
 
-        # We have divs for micro news
-        bnews_settings['show'] = True
-        for bnews_micro_div in bnews_micro_divs:
-            settings = copy.deepcopy(bnews_settings)
-            settings['data_source'] = get_attribute(bnews_micro_div.attrs, 'source', None)
-            settings['mode'] = get_attribute(bnews_micro_div.attrs, 'mode', bnews_settings['mode'])
-            settings['header'] = get_attribute(bnews_micro_div.attrs, 'header', bnews_settings['header'])
-            settings['header-link'] = get_attribute(bnews_micro_div.attrs, 'header-link', bnews_settings['header-link'])
-            settings['category'] = get_attribute(bnews_micro_div.attrs, 'category', bnews_settings['category'])
-
-            if settings['category']:
-                settings['category'] = settings['category'].split(',')
-
-            settings['shorten-category-label'] = boolean(
-                get_attribute(bnews_micro_div.attrs, 'shorten-category-label', bnews_settings['shorten-category-label'])
-            )
+        elif not isinstance(date, datetime.datetime):
+            date = datetime.datetime(year=date.year, month=date.month, day=date.day)
 
-            settings['count'] = get_attribute(bnews_micro_div.attrs, 'count', bnews_settings['count'])
-            if settings['count']:
-                settings['count'] = int(settings['count'])
+        date = date.replace(tzinfo=None)
 
-            settings['panel-color'] = get_attribute(bnews_micro_div.attrs, 'panel-color', bnews_settings['panel-color'])
-            settings['show-categories'] = get_attribute(bnews_micro_div.attrs, 'show-categories', bnews_settings['show-categories']) == 'True'
-            settings['show-summary'] = get_attribute(bnews_micro_div.attrs, 'show-summary', bnews_settings['show-summary']) == 'True'
+        if date_format == 'relative':
+            text = format_timedelta(date - bnews_dates['now'], add_direction=True, locale=locale)
 
-            settings['articles'] = load_micro_news(settings['data_source'])
+        else:
+            text = format_datetime(date, format='medium', locale=locale)
 
-            div_html = generate_listing(settings=settings)
-            bnews_micro_div.replaceWith(div_html)
+        bnews_dates['formatted'][key] = text
 
-    if bnews_settings['show']:
+    return bnews_dates['formatted'][key]
 
-        if bnews_settings['minified']:
-            html_elements = {
-                'js_include': [
-                    '<script type="text/javascript" src="' + bnews_settings['site-url'] + '/theme/js/timeago.min.js"></script>',
-                    '<script type="text/javascript" src="' + bnews_settings['site-url'] + '/theme/js/bnews.min.js"></script>'
-                ],
-                'css_include': [
-                    '<link rel="stylesheet" href="' + bnews_settings['site-url'] + '/theme/css/bnews.min.css">'
-                ]
-            }
 
-        else:
-            html_elements = {
-                'js_include': [
-                    '<script type="text/javascript" src="' + bnews_settings['site-url'] + '/theme/js/timeago.js"></script>',
-                    '<script type="text/javascript" src="' + bnews_settings['site-url'] + '/theme/js/bnews.js"></script>',
-                ],
-                'css_include': [
-                    '<link rel="stylesheet" href="' + bnews_settings['site-url'] + '/theme/css/bnews.css">'
-                ]
-            }
+def get_locale(name):
+    """
+    Get babel locale, Pelican style names like `en-US` or `pt-br` are accepted
+    :param name: locale name
+    :return: babel.Locale
+    """
 
-        if u'styles' not in content.metadata:
-            content.metadata[u'styles'] = []
+    from babel import Locale, UnknownLocaleError
 
-        for element in html_elements['js_include']:
-            if element not in content.metadata[u'scripts']:
-                content.metadata[u'scripts'].append(element)
+    try:
+        return Locale.parse(str(name).replace('-', '_'))
 
-        for element in html_elements['css_include']:
-            if element not in content.metadata[u'styles']:
-                content.metadata[u'styles'].append(element)
+    except (ValueError, TypeError, UnknownLocaleError):
+        logger.warn('`pelican-bnews` unknown date locale [' + str(name) + '], using [en]')
+        return Locale.parse('en')
 
-    content._content = soup.decode()
 
+def get_records(articles):
+    """
+    Get listing records for articles
+    :param articles: list of pelican articles or micro news dicts
+    :return: list of ArticleRecord
+    """
 
-def process_page_metadata(generator, metadata):
+    return [
+        ArticleRecord(
+            article=article,
+            site_url=bnews_settings['site-url'],
+            category_label_css=bnews_settings['category-label-css']
+        ) for article in articles
+    ]
+
+
+def get_template_environment():
+    """
+    Get shared Jinja environment, created on first use
+    :return: jinja2.Environment
     """
-    Process page metadata and assign css
 
+    if bnews_templates['environment'] is None:
+        from jinja2 import Environment, FunctionLoader, FileSystemBytecodeCache
+
+        bytecode_cache = None
+        if bnews_settings['template-bytecode-cache']:
+            if not os.path.exists(bnews_settings['template-bytecode-cache']):
+                os.makedirs(bnews_settings['template-bytecode-cache'])
+
+            bytecode_cache = FileSystemBytecodeCache(bnews_settings['template-bytecode-cache'])
+
+        bnews_templates['environment'] = Environment(
+            loader=FunctionLoader(lambda name: bnews_templates['sources'].get(name)),
+            bytecode_cache=bytecode_cache
+        )
+
+    return bnews_templates['environment']
+
+
+def get_template(template_set, mode, source):
+    """
+    Get compiled template, each template source is compiled once per build
+    :param template_set: template set name, template or item-template
+    :param mode: layout mode
+    :param source: template source
+    :return: jinja2.Template
     """
 
-    global bnews_default_settings, bnews_settings
+    key = (template_set, mode, source)
+    if key not in bnews_templates['compiled']:
+        name = template_set + '/' + mode + '/' + hashlib.md5(source.encode('utf-8')).hexdigest()
+        bnews_templates['sources'][name] = source.strip('\t\r\n').replace('&gt;', '>').replace('&lt;', '<')
+        bnews_templates['compiled'][key] = get_template_environment().get_template(name)
 
-    # Inject article listing
-    article_listing = bnews_settings['articles']
-    bnews_settings = copy.deepcopy(bnews_default_settings)
-    bnews_settings['articles'] = article_listing
+    return bnews_templates['compiled'][key]
 
-    if u'styles' not in metadata:
-        metadata[u'styles'] = []
+
+@profiled('settings')
+def get_content_settings(metadata):
+    """
+    Get settings for a single content, content metadata is layered over the global settings.
+    Settings are kept per content, global settings are never modified while processing content.
+    :param metadata: content metadata
+    :return: settings mapping
+    """
+
+    settings = collections.ChainMap({}, types.MappingProxyType(bnews_settings))
 
     if u'bnews' in metadata and (metadata['bnews'] == 'True' or metadata['bnews'] == 'true'):
-        bnews_settings['show'] = True
-        bnews_settings['template-variable'] = True
+        settings['show'] = True
+        settings['template-variable'] = True
 
     else:
-        bnews_settings['show'] = False
-        bnews_settings['template-variable'] = False
+        settings['show'] = False
+        settings['template-variable'] = False
 
     if u'bnews_mode' in metadata:
-        bnews_settings['mode'] = metadata['bnews_mode']
+        settings['mode'] = metadata['bnews_mode']
 
     if u'bnews_panel_color' in metadata:
-        bnews_settings['panel-color'] = metadata['bnews_panel_color']
+        settings['panel-color'] = metadata['bnews_panel_color']
 
     if u'bnews_header' in metadata:
-        bnews_settings['header'] = metadata['bnews_header']
+        settings['header'] = metadata['bnews_header']
 
     if u'bnews_header_link' in metadata:
-        bnews_settings['header-link'] = metadata['bnews_header_link']
+        settings['header-link'] = metadata['bnews_header_link']
 
     if u'bnews_count' in metadata:
-        bnews_settings['count'] = int(metadata['bnews_count'])
+        settings['count'] = int(metadata['bnews_count'])
 
     if u'bnews_category' in metadata:
-        bnews_settings['category'] = metadata['bnews_category']
+        settings['category'] = metadata['bnews_category']
 
     if u'bnews_show_categories' in metadata:
-        bnews_settings['show-categories'] = metadata['bnews_show_categories']
+        settings['show-categories'] = metadata['bnews_show_categories']
 
     if u'bnews_show_summary' in metadata:
-        bnews_settings['show-summary'] = metadata['bnews_show_summary']
+        settings['show-summary'] = metadata['bnews_show_summary']
 
+    return settings
 
-def move_resources(gen):
-    """
-    Move files from css folders to output folder, use minified files.
 
+@profiled('settings')
+def get_div_settings(attrs, content_settings):
+    """
+    Get settings for a single div, div attributes are layered over the content settings
+    without copying them, article listing is shared by reference.
+    :param attrs: attribute dict
+    :param content_settings: content settings mapping
+    :return: settings mapping
     """
 
-    plugin_paths = gen.settings['PLUGIN_PATHS']
-    if bnews_settings['minified']:
-        if bnews_settings['generate_minified']:
-            minify_css_directory(gen=gen, source='css', target='css.min')
-            minify_js_directory(gen=gen, source='js', target='js.min')
+    defaults = content_settings
+    settings = content_settings.new_child()
 
-        css_target = os.path.join(gen.output_path, 'theme', 'css', 'bnews.min.css')
+    settings['mode'] = get_attribute(attrs, 'mode', defaults['mode'])
+    settings['header'] = get_attribute(attrs, 'header', defaults['header'])
+    settings['header-link'] = get_attribute(attrs, 'header-link', defaults['header-link'])
+    settings['category'] = get_attribute(attrs, 'category', defaults['category'])
 
-        if not os.path.exists(os.path.join(gen.output_path, 'theme', 'css')):
-            os.makedirs(os.path.join(gen.output_path, 'theme', 'css'))
+    if settings['category']:
+        settings['category'] = settings['category'].split(',')
 
-        js_target_1 = os.path.join(gen.output_path, 'theme', 'js', 'timeago.min.js')
-        js_target_2 = os.path.join(gen.output_path, 'theme', 'js', 'bnews.min.js')
+    settings['shorten-category-label'] = boolean(
+        get_attribute(attrs, 'shorten-category-label', defaults['shorten-category-label'])
+    )
 
-        if not os.path.exists(os.path.join(gen.output_path, 'theme', 'js')):
-            os.makedirs(os.path.join(gen.output_path, 'theme', 'js'))
+    settings['count'] = get_attribute(attrs, 'count', defaults['count'])
+    if settings['count']:
+        settings['count'] = int(settings['count'])
 
-        for path in plugin_paths:
-            css_source = os.path.join(path, 'pelican-bnews', 'css.min', 'bnews.min.css')
-            if os.path.isfile(css_source):
-                shutil.copyfile(css_source, css_target)
+    settings['panel-color'] = get_attribute(attrs, 'panel-color', defaults['panel-color'])
+    settings['show-categories'] = get_attribute(attrs, 'show-categories', defaults['show-categories']) == 'True'
+    settings['show-summary'] = get_attribute(attrs, 'show-summary', defaults['show-summary']) == 'True'
 
-            js_source_1 = os.path.join(path, 'pelican-bnews', 'js.min', 'timeago.min.js')
-            js_source_2 = os.path.join(path, 'pelican-bnews', 'js.min', 'bnews.min.js')
+    return settings
 
-            if os.path.isfile(js_source_1):
-                shutil.copyfile(js_source_1, js_target_1)
 
-            if os.path.isfile(js_source_2):
-                shutil.copyfile(js_source_2, js_target_2)
+def get_category(article):
+    """
+    Get category name of the article
+    :param article: pelican article or micro news dict
+    :return: category name
+    """
 
-            if os.path.isfile(css_target) and os.path.isfile(js_target_1) and os.path.isfile(js_target_2):
-                break
-    else:
-        css_target = os.path.join(gen.output_path, 'theme', 'css', 'bnews.css')
+    if hasattr(article, 'category'):
+        return article.category.name
 
-        if not os.path.exists(os.path.join(gen.output_path, 'theme', 'css')):
-            os.makedirs(os.path.join(gen.output_path, 'theme', 'css'))
+    elif 'category' in article:
+        return article['category']
 
-        js_target_1 = os.path.join(gen.output_path, 'theme', 'js', 'timeago.js')
-        js_target_2 = os.path.join(gen.output_path, 'theme', 'js', 'bnews.js')
-        for path in plugin_paths:
-            css_source = os.path.join(path, 'pelican-bnews', 'css', 'bnews.css')
+    else:
+        return None
 
-            if os.path.isfile(css_source):
-                shutil.copyfile(css_source, css_target)
 
-            js_source_1 = os.path.join(path, 'pelican-bnews', 'js', 'timeago.js')
-            js_source_2 = os.path.join(path, 'pelican-bnews', 'js', 'bnews.js')
+def get_categories(category):
+    """
+    Normalise category filter into a set
+    :param category: comma separated string or list of categories
+    :return: frozenset or None
+    """
 
-            if os.path.isfile(js_source_1):
-                shutil.copyfile(js_source_1, js_target_1)
+    if not category:
+        return None
 
-            if os.path.isfile(js_source_2):
-                shutil.copyfile(js_source_2, js_target_2)
+    if isinstance(category, str):
+        category = category.split(',')
 
-            if os.path.isfile(css_target) and os.path.isfile(js_target_1) and os.path.isfile(js_target_2):
-                break
+    return frozenset(item.strip() for item in category)
 
 
-def minify_css_directory(gen, source, target):
+def build_category_index(records):
     """
-    Move CSS resources from source directory to target directory and minify. Using rcssmin.
+    Build category index for the article listing
+    :param records: list of ArticleRecord
+    :return: dict, category name to list of article positions in listing order
+    """
+
+    index = {}
+    for article_id, record in enumerate(records):
+        index.setdefault(record.category, []).append(article_id)
 
+    return index
+
+
+def get_listing_articles(settings):
+    """
+    Select articles for the listing, article listing and micro news sources are merged based on date
+    :param settings: settings mapping
+    :return: list of ArticleRecord
     """
 
-    import rcssmin
+    count = settings['count']
+    categories = get_categories(settings['category'])
 
-    plugin_paths = gen.settings['PLUGIN_PATHS']
-    for path in plugin_paths:
-        source_ = os.path.join(path, 'pelican-bnews', source)
-        target_ = os.path.join(path, 'pelican-bnews', target)
-        if os.path.isdir(source_):
-            if not os.path.exists(target_):
-                os.makedirs(target_)
+    streams = []
+    if settings['include-articles'] and settings['articles']:
+        article_stream = get_article_stream(settings['articles'], categories)
+        if settings.get('micro-news') and not is_date_ordered(settings['articles']):
+            # Merging needs newest first order, article listing follows ARTICLE_ORDER_BY
+            article_stream = heapq.nlargest(count, article_stream, key=lambda record: record.sort_date)
 
-            for root, dirs, files in os.walk(source_):
-                for current_file in files:
-                    if current_file.endswith(".css"):
-                        current_file_path = os.path.join(root, current_file)
-                        with open(current_file_path, encoding="utf-8") as css_file:
-                            with open(os.path.join(target_, current_file.replace('.css', '.min.css')), "w", encoding="utf-8") as minified_file:
-                                minified_file.write(rcssmin.cssmin(css_file.read(), keep_bang_comments=True))
+        streams.append(article_stream)
 
+    for records in settings.get('micro-news') or []:
+        if categories:
+            streams.append(record for record in records if record.category in categories)
 
-def minify_js_directory(gen, source, target):
-    """
-    Move JS resources from source directory to target directory and minify.
+        else:
+            streams.append(records)
+
+    if len(streams) == 1:
+        return list(itertools.islice(streams[0], count))
 
+    # Streams are already sorted, merge stops after count items
+    return list(itertools.islice(
+        heapq.merge(*streams, key=lambda record: record.sort_date, reverse=True),
+        count
+    ))
+
+
+def get_article_stream(articles, categories):
+    """
+    Get records of the article listing in listing order
+    :param articles: article listing
+    :param categories: set of categories or None
+    :return: iterable of ArticleRecord
     """
 
-    from jsmin import jsmin
+    records = articles
+    if articles is bnews_listings['articles']:
+        records = bnews_listings['records']
 
-    plugin_paths = gen.settings['PLUGIN_PATHS']
-    for path in plugin_paths:
-        source_ = os.path.join(path, 'pelican-bnews', source)
-        target_ = os.path.join(path, 'pelican-bnews', target)
+        if categories:
+            # Merge the per category position lists, listing order is kept
+            index = bnews_listings['category-index']
+            positions = heapq.merge(*[index[category] for category in categories if category in index])
+            return (records[article_id] for article_id in positions)
 
-        if os.path.isdir(source_):
-            if not os.path.exists(target_):
-                os.makedirs(target_)
+    if not categories:
+        return records
 
-            for root, dirs, files in os.walk(source_):
-                for current_file in files:
-                    if current_file.endswith(".js"):
-                        current_file_path = os.path.join(root, current_file)
-                        with open(current_file_path, encoding="utf-8") as js_file:
-                            with open(os.path.join(target_, current_file.replace('.js', '.min.js')), "w", encoding="utf-8") as minified_file:
-                                minified_file.write(jsmin(js_file.read()))
+    return (record for record in records if record.category in categories)
 
 
-def get_articles(generator):
+def is_date_ordered(articles):
     """
-    Fetch article listing
+    Check whether article listing is ordered newest first
+    :param articles: article listing
+    :return: bool
+    """
+
+    if articles is bnews_listings['articles']:
+        return bnews_listings['date-ordered']
 
+    return check_date_order(articles)
+
+
+def check_date_order(records):
+    """
+    Check whether records are ordered newest first
+    :param records: list of ArticleRecord
+    :return: bool
     """
 
-    bnews_settings['articles'] = generator.articles
-    move_resources(generator)
+    return all(current.sort_date >= following.sort_date for current, following in zip(records, records[1:]))
 
 
-def init_default_config(pelican):
+def get_sources(data_source):
     """
-    Handle settings from pelicanconf.py
+    Split comma separated micro news sources
+    :param data_source: data source attribute
+    :return: list of sources
+    """
+
+    if not data_source:
+        return [data_source]
 
+    return [source.strip() for source in data_source.split(',')]
+
+
+def has_listing_articles(settings):
+    """
+    Check whether listing has any articles to show
+    :param settings: settings mapping
+    :return: bool
     """
 
-    global bnews_default_settings, bnews_settings
+    return bool((settings['include-articles'] and settings['articles']) or settings.get('micro-news'))
 
-    bnews_default_settings['site-url'] = pelican.settings['SITEURL']
-    if 'BNEWS_HEADER' in pelican.settings:
-        bnews_default_settings['header'] = pelican.settings['BNEWS_HEADER']
 
-    if 'BNEWS_HEADER_LINK' in pelican.settings:
-        bnews_default_settings['header-link'] = pelican.settings['BNEWS_HEADER_LINK']
+def get_listing_key(settings):
+    """
+    Get cache key for rendered listing
+    :param settings: settings mapping
+    :return: tuple
+    """
 
-    if 'BNEWS_TEMPLATE' in pelican.settings:
-        bnews_default_settings['template'].update(pelican.settings['BNEWS_TEMPLATE'])
+    version = []
+    if settings['include-articles']:
+        version.append(bnews_listings['version'])
 
-    if 'BNEWS_ITEM_TEMPLATE' in pelican.settings:
-        bnews_default_settings['item-template'].update(pelican.settings['BNEWS_ITEM_TEMPLATE'])
+    if 'data_source' in settings:
+        # Micro news, versioned by the source files
+        for source in get_sources(settings['data_source']):
+            if source and os.path.isfile(source):
+                source_stat = os.stat(source)
+                version.append((source, source_stat.st_mtime, source_stat.st_size))
+            else:
+                version.append((source, None, None))
+
+    version = tuple(version)
+
+    return (
+        version,
+        settings['include-articles'],
+        settings['mode'],
+        settings['template'][settings['mode']],
+        settings['item-template'][settings['mode']],
+        settings['header'],
+        settings['header-link'],
+        get_categories(settings['category']),
+        settings['count'],
+        settings['panel-color'],
+        settings['show-categories'],
+        settings['show-summary'],
+        settings['summary-max-chars'],
+        settings['date-format'],
+        settings['date-locale'],
+        settings['shorten-category-label'],
+        settings['site-url'],
+        settings['normalize-html']
+    )
+
+
+def load_listing_articles(settings):
+    """
+    Load micro news entries for listings with micro news sources
+    :param settings: settings mapping
+    """
 
-    if 'BNEWS_PANEL_COLOR' in pelican.settings:
-        bnews_default_settings['panel-color'] = pelican.settings['BNEWS_PANEL_COLOR']
+    if 'data_source' in settings and 'micro-news' not in settings.maps[0]:
+        micro_news = []
+        for source in get_sources(settings['data_source']):
+            if settings['micro-news-streaming']:
+                records = load_micro_news(
+                    source,
+                    limit=settings['count'],
+                    categories=get_categories(settings['category'])
+                )
 
-    if 'BNEWS_CATEGORY_LABEL_CSS' in pelican.settings:
-        bnews_default_settings['category-label-css'] = pelican.settings['BNEWS_CATEGORY_LABEL_CSS']
+            else:
+                records = load_micro_news(source)
 
-    if 'BNEWS_MINIFIED' in pelican.settings:
-        bnews_default_settings['minified'] = pelican.settings['BNEWS_MINIFIED']
+            if records:
+                micro_news.append(records)
 
-    if 'BNEWS_GENERATE_MINIFIED' in pelican.settings:
-        bnews_default_settings['generate_minified'] = pelican.settings['BNEWS_GENERATE_MINIFIED']
+        settings['micro-news'] = micro_news
 
-    if 'BNEWS_DEBUG_PROCESSING' in pelican.settings:
-        bnews_default_settings['debug_processing'] = pelican.settings['BNEWS_DEBUG_PROCESSING']
 
-    bnews_settings = copy.deepcopy(bnews_default_settings)
+def get_listing_fingerprint(settings):
+    """
+    Get fingerprint of the articles shown in the listing
+    :param settings: settings mapping
+    :return: str
+    """
+
+    # Computed once per distinct listing within the build
+    key = get_listing_key(settings)
+    if key in bnews_listings['fingerprints']:
+        return bnews_listings['fingerprints'][key]
+
+    load_listing_articles(settings)
+
+    if has_listing_articles(settings):
+        fingerprint = []
+        for record in get_listing_articles(settings):
+            if record.source_path:
+                fingerprint.append((record.source_path, os.path.getmtime(record.source_path), record.url))
+
+            else:
+                fingerprint.append((record.title, record.date, record.url, record.category, record.summary))
+
+        fingerprint = hashlib.md5(repr(fingerprint).encode('utf-8')).hexdigest()
+
+    else:
+        fingerprint = None
+
+    bnews_listings['fingerprints'][key] = fingerprint
+
+    return fingerprint
+
+
+@profiled('listing')
+def get_listing(settings):
+    """
+    Get rendered listing, identical listings are rendered once and reused
+    :param settings: settings mapping
+    :return: str
+    """
+
+    cache = bnews_listings['cache']
+    cache_size = settings['listing-cache-size']
+
+    if cache_size:
+        key = get_listing_key(settings)
+        if key in cache:
+            bnews_stats['listing_cache_hits'] += 1
+            cache.move_to_end(key)
+            if settings['json-feed']:
+                return get_feed_placeholder(settings, cache[key])
+
+            return cache[key]
+
+        bnews_stats['listing_cache_misses'] += 1
+
+    load_listing_articles(settings)
+
+    if has_listing_articles(settings):
+        html = generate_listing(settings=settings)
+    else:
+        html = ''
+
+    if cache_size:
+        cache[key] = html
+        while len(cache) > cache_size:
+            cache.popitem(last=False)
+
+    if settings['json-feed']:
+        return get_feed_placeholder(settings, html)
+
+    return html
+
+
+def get_feed_placeholder(settings, html):
+    """
+    Publish rendered listing as json feed and get placeholder loading it in the browser. Feed is named after the
+    listing configuration, new articles change only the feed.
+    :param settings: settings mapping
+    :param html: rendered listing
+    :return: str
+    """
+
+    listing_key = get_listing_key(settings)
+    feed_id = hashlib.md5(repr(listing_key[1:]).encode('utf-8')).hexdigest()[:16]
+    if feed_id not in bnews_feeds or bnews_feeds[feed_id]['version'] != listing_key[0]:
+        # Built again when the articles or micro news sources have changed
+        load_listing_articles(settings)
+
+        items = []
+        for record in get_listing_articles(settings):
+            item = {
+                'title': record.title,
+                'date': record.date_text,
+                'url': record.url,
+                'category': record.category
+            }
+
+            if settings['show-summary']:
+                item['summary'] = record.get_summary(settings['summary-max-chars'])
+
+            items.append(item)
+
+        bnews_feeds[feed_id] = {
+            'version': listing_key[0],
+            'html': html,
+            'items': items
+        }
+
+    return '<div class="bnews-feed" data-feed="' + settings['site-url'] + '/' + get_feed_path(feed_id) + '"></div>'
+
+
+def get_feed_path(feed_id):
+    """
+    Get json feed file path relative to output folder
+    :param feed_id: feed id
+    :return: str
+    """
+
+    return 'theme/bnews/bnews.' + feed_id + '.json'
+
+
+def write_feeds(output_path):
+    """
+    Write json feeds into output folder, feed file is rewritten only when its content changes
+    :param output_path: output folder
+    """
+
+    for feed_id, feed in bnews_feeds.items():
+        feed_path = os.path.join(output_path, *get_feed_path(feed_id).split('/'))
+        data = json.dumps(
+            {'html': feed['html'], 'items': feed['items']},
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str
+        )
+
+        if os.path.isfile(feed_path):
+            with open(feed_path, encoding='utf-8') as feed_file:
+                if feed_file.read() == data:
+                    continue
+
+        elif not os.path.exists(os.path.dirname(feed_path)):
+            os.makedirs(os.path.dirname(feed_path))
+
+        with open(feed_path, 'w', encoding='utf-8') as feed_file:
+            feed_file.write(data)
+
+
+def generate_listing(settings):
+    html = "\n"
+
+    listing_articles = get_listing_articles(settings)
+    for article in listing_articles:
+        html += generate_item(
+            article=article,
+            settings=settings
+        ) + "\n"
+
+    html += "\n"
+
+    count = len(listing_articles)
+    if count:
+        template = get_template('template', settings['mode'], settings['template'][settings['mode']])
+        with profile('template-render'):
+            div_html = template.render(
+                news_list=html,
+                header=settings['header'],
+                site_url=settings['site-url'],
+                header_link=settings['header-link'],
+                panel_color=settings['panel-color']
+            )
+
+        if settings['normalize-html']:
+            from bs4 import BeautifulSoup
+            div_html = BeautifulSoup(div_html, "html.parser").decode()
+
+        return div_html
+    else:
+        return ''
+
+
+def generate_item(article, settings):
+    if settings['show-categories']:
+        if settings['shorten-category-label']:
+            article_category = article.category_label_short
+
+        else:
+            article_category = article.category_label
+
+    else:
+        article_category = ''
+
+    if settings['show-summary']:
+        article_summary = article.get_summary(settings['summary-max-chars'])
+
+    else:
+        article_summary = None
+
+    template = get_template('item-template', settings['mode'], settings['item-template'][settings['mode']])
+    with profile('template-render'):
+        html = template.render(
+            site_url=settings['site-url'],
+            article_url=article.url,
+            article_url_target=article.url_target,
+            article_title=article.title,
+            article_date=article.date_text,
+            article_date_text=format_date(article.date, settings),
+            article_date_relative=settings['date-format'] != 'absolute',
+            article_category=article_category,
+            article_summary=article_summary
+        )
+
+    if settings['normalize-html']:
+        from bs4 import BeautifulSoup
+        html = BeautifulSoup(html, "html.parser").decode()
+
+    return html
+
+
+class PlaceholderScanner(HTMLParser):
+    """
+    Find bnews placeholder divs and their offsets without building a document tree
+    """
+
+    placeholder_classes = ('bnews', 'bnews-micro')
+
+    def __init__(self, html):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.html = html
+        self.line_offsets = [0] + [match.end() for match in re.finditer('\n', html)]
+        self.placeholders = []
+        self.current = None
+        self.depth = 0
+
+    def get_offset(self):
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def get_placeholder_class(self, attrs):
+        for name, value in attrs:
+            if name == 'class' and value:
+                for class_name in value.split():
+                    if class_name in self.placeholder_classes:
+                        return class_name
+
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'div':
+            return
+
+        if self.current:
+            # Nested divs inside the placeholder are replaced with it
+            self.depth += 1
+            return
+
+        class_name = self.get_placeholder_class(attrs)
+        if class_name:
+            # Valueless attributes are read as empty strings
+            self.current = {
+                'start': self.get_offset(),
+                'class': class_name,
+                'attrs': dict((name, value if value is not None else '') for name, value in attrs)
+            }
+            self.depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        start = self.get_offset()
+        self.handle_starttag(tag, attrs)
+        if self.current and self.current['start'] == start:
+            self.close_placeholder(start + len(self.get_starttag_text()))
+
+        elif self.current and tag == 'div':
+            self.depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag != 'div' or not self.current:
+            return
+
+        self.depth -= 1
+        if self.depth == 0:
+            self.close_placeholder(self.html.index('>', self.get_offset()) + 1)
+
+    def close_placeholder(self, end):
+        self.current['end'] = end
+        self.placeholders.append(self.current)
+        self.current = None
+
+    def close(self):
+        HTMLParser.close(self)
+        if self.current:
+            # Unclosed placeholder extends to the end of the document
+            self.close_placeholder(len(self.html))
+
+
+def find_placeholders(html):
+    """
+    Find bnews placeholder divs in html
+    :param html: raw content
+    :return: list of dicts with start and end offset, class and attributes
+    """
+
+    scanner = PlaceholderScanner(html)
+    scanner.feed(html)
+    scanner.close()
+
+    return scanner.placeholders
+
+
+def has_bnews_markers(content, settings):
+    """
+    Check raw content for bnews markers without parsing it
+    :param content: content object
+    :param settings: content settings mapping
+    :return: bool
+    """
+
+    if settings['template-variable']:
+        return True
+
+    return bool(content._content) and 'bnews' in content._content
+
+
+@profiled('micro-news-load')
+def load_micro_news(source, limit=None, categories=None):
+    """
+    Load micro news source, each file is parsed and sorted once as long as it stays unchanged
+    :param source: path to yaml, json or json lines file
+    :param limit: keep only given count of newest entries, source is streamed instead of loaded fully
+    :param categories: set of categories to keep, used only with limit
+    :return: list of ArticleRecord sorted by date, False if loading fails
+    """
+
+    if source and os.path.isfile(source):
+        source_stat = os.stat(source)
+        source_version = (source_stat.st_mtime, source_stat.st_size)
+        # Records hold urls and category labels, stored records are valid only with the same settings
+        source_key = (
+            source,
+            limit is not None,
+            bnews_settings['site-url'],
+            repr(sorted((bnews_settings['category-label-css'] or {}).items()))
+        )
+
+        if not bnews_micro_news['sidecar-loaded']:
+            load_micro_news_sidecar()
+
+        stored = bnews_micro_news['sources'].get(source_key)
+        if limit is None:
+            if stored and stored[0] == source_version:
+                return stored[1]
+
+        elif stored and stored[0] == source_version and stored[1][0] >= limit:
+            return select_micro_news(stored[1], limit, categories)
+
+        import yaml
+
+        try:
+            if limit is not None:
+                # Streamed again only when a listing needs more entries than any listing before
+                micro_news_registry = stream_micro_news(
+                    source,
+                    max(limit, bnews_micro_news['stream-limit'], stored[1][0] if stored else 0)
+                )
+
+            else:
+                micro_news_registry = read_micro_news(source)
+
+                # Sort based on date
+                micro_news_registry = get_records(sorted(micro_news_registry, key=lambda d: d['date'], reverse=True))
+
+            bnews_micro_news['sources'][source_key] = (source_version, micro_news_registry)
+            bnews_micro_news['modified'] = True
+
+            if limit is not None:
+                return select_micro_news(micro_news_registry, limit, categories)
+
+            return micro_news_registry
+
+        except (ValueError, yaml.YAMLError):
+            logger.warn('`pelican-bnews` failed to load file [' + str(source) + ']')
+            return False
+
+    else:
+        logger.warn('`pelican-bnews` failed to load file [' + str(source) + ']')
+        return False
+
+
+def stream_micro_news(source, limit):
+    """
+    Stream micro news source once and keep the newest entries of each category in bounded heaps, newest entries
+    of any category set are among them
+    :param source: path to yaml, json or json lines file
+    :param limit: count of newest entries kept per category
+    :return: tuple of limit, list of ArticleRecord sorted by date and dict of record positions per category
+    """
+
+    heaps = {}
+    for index, item in enumerate(iter_micro_news(source)):
+        # Earlier entry wins on the same date, as in sorting
+        entry = (item['date'], -index, item)
+        heap = heaps.setdefault(get_category(item), [])
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    entries = sorted(itertools.chain.from_iterable(heaps.values()), reverse=True)
+    records = get_records([entry[2] for entry in entries])
+
+    category_positions = {}
+    for position, record in enumerate(records):
+        category_positions.setdefault(record.category, []).append(position)
+
+    return limit, records, category_positions
+
+
+def select_micro_news(micro_news_registry, limit, categories=None):
+    """
+    Select newest streamed micro news
+    :param micro_news_registry: result of stream_micro_news
+    :param limit: count of entries
+    :param categories: set of categories to keep
+    :return: list of ArticleRecord sorted by date
+    """
+
+    records, category_positions = micro_news_registry[1:]
+    if not categories:
+        return records[:limit]
+
+    positions = sorted(itertools.chain.from_iterable(
+        category_positions.get(category, ()) for category in categories
+    ))
+
+    return [records[position] for position in positions[:limit]]
+
+
+def get_micro_news_loader():
+    """
+    Get yaml loader for micro news, libyaml based loader is used when available
+    :return: yaml loader class
+    """
+
+    if bnews_micro_news['loader'] is None:
+        import yaml
+        bnews_micro_news['loader'] = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    return bnews_micro_news['loader']
+
+
+def get_micro_news_stream_loader():
+    """
+    Get yaml loader for streaming micro news, entries are composed from libyaml parser events when available
+    :return: yaml loader class
+    """
+
+    if bnews_micro_news['stream-loader'] is None:
+        import yaml
+
+        if getattr(yaml, '__with_libyaml__', False):
+            class StreamLoader(yaml.cyaml.CParser, yaml.composer.Composer, yaml.constructor.SafeConstructor,
+                               yaml.resolver.Resolver):
+                def __init__(self, stream):
+                    yaml.cyaml.CParser.__init__(self, stream)
+                    yaml.composer.Composer.__init__(self)
+                    yaml.constructor.SafeConstructor.__init__(self)
+                    yaml.resolver.Resolver.__init__(self)
+
+            bnews_micro_news['stream-loader'] = StreamLoader
+
+        else:
+            bnews_micro_news['stream-loader'] = yaml.SafeLoader
+
+    return bnews_micro_news['stream-loader']
+
+
+def read_micro_news(source):
+    """
+    Read all entries from micro news source
+    :param source: path to yaml, json or json lines file
+    :return: list of micro news
+    """
+
+    if source.endswith('.jsonl'):
+        return list(iter_micro_news(source))
+
+    with open(source, 'r', encoding='utf-8') as field:
+        if source.endswith('.json'):
+            micro_news_registry = json.load(field)
+
+        else:
+            import yaml
+            micro_news_registry = yaml.load(field, Loader=get_micro_news_loader())
+
+    if 'data' in micro_news_registry:
+        micro_news_registry = micro_news_registry['data']
+
+    return micro_news_registry
+
+
+def iter_micro_news(source):
+    """
+    Iterate entries from micro news source without loading the whole file
+    :param source: path to yaml, json or json lines file
+    :return: generator of micro news
+    """
+
+    if source.endswith('.json'):
+        # Plain json can not be streamed
+        for item in read_micro_news(source):
+            yield item
+
+        return
+
+    with open(source, 'r', encoding='utf-8') as field:
+        if source.endswith('.jsonl'):
+            for line in field:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+            return
+
+        import yaml
+
+        # Compose and construct one list entry at a time from the yaml event stream,
+        # entries are either the root sequence or the sequence under `data` key.
+        loader = get_micro_news_stream_loader()(field)
+        try:
+            loader.get_event()
+            if not loader.check_event(yaml.DocumentStartEvent):
+                return
+
+            loader.get_event()
+            if loader.check_event(yaml.MappingStartEvent):
+                loader.get_event()
+                while not loader.check_event(yaml.MappingEndEvent):
+                    key = loader.compose_node(None, None)
+                    if isinstance(key, yaml.ScalarNode) and key.value == 'data':
+                        break
+
+                    loader.compose_node(None, None)
+
+                else:
+                    return
+
+            if not loader.check_event(yaml.SequenceStartEvent):
+                return
+
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node = loader.compose_node(None, None)
+                item = loader.construct_object(node, deep=True)
+                loader.constructed_objects = {}
+                yield item
+
+        finally:
+            loader.dispose()
+
+
+def load_micro_news_sidecar():
+    """
+    Load parsed micro news sources stored by the previous build
+
+    """
+
+    bnews_micro_news['sidecar-loaded'] = True
+
+    sidecar = bnews_settings['micro-news-cache']
+    if sidecar and os.path.isfile(sidecar):
+        try:
+            with open(sidecar, 'rb') as sidecar_file:
+                bnews_micro_news['sources'].update(pickle.load(sidecar_file))
+
+        except Exception:
+            logger.warn('`pelican-bnews` failed to load micro news cache [' + str(sidecar) + ']')
+
+
+def save_micro_news_sidecar():
+    """
+    Store parsed micro news sources for the next build
+
+    """
+
+    sidecar = bnews_settings['micro-news-cache']
+    if sidecar and bnews_micro_news['modified']:
+        if not os.path.exists(os.path.dirname(sidecar)):
+            os.makedirs(os.path.dirname(sidecar))
+
+        with open(sidecar, 'wb') as sidecar_file:
+            pickle.dump(bnews_micro_news['sources'], sidecar_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        bnews_micro_news['modified'] = False
+
+
+def get_content_key(content, settings):
+    """
+    Get cache key for the content, depends on the raw content and the content level settings
+    :param content: content object
+    :param settings: content settings mapping
+    :return: str
+    """
+
+    if bnews_content_cache['settings-key'] is None:
+        # Global settings are the same for all content
+        bnews_content_cache['settings-key'] = repr(sorted(
+            ((field, value) for field, value in bnews_settings.items() if field != 'articles'),
+            key=lambda item: item[0]
+        )).encode('utf-8')
+
+    key = hashlib.md5(content._content.encode('utf-8'))
+    key.update(bnews_content_cache['settings-key'])
+    key.update(repr(sorted(settings.maps[0].items(), key=lambda item: item[0])).encode('utf-8'))
+
+    if settings['date-format'] == 'relative':
+        # Relative dates change over time, render again daily
+        key.update(str(bnews_dates['now'].date()).encode('utf-8'))
+
+    return key.hexdigest()
+
+
+def get_cached_content(content_key, content_settings):
+    """
+    Get cached rendered content, valid only when the listings it uses are unchanged
+    :param content_key: content cache key
+    :param content_settings: content settings mapping
+    :return: cache entry or None
+    """
+
+    if not bnews_content_cache['loaded']:
+        bnews_content_cache['loaded'] = True
+        if os.path.isfile(bnews_settings['content-cache']):
+            try:
+                with open(bnews_settings['content-cache'], 'rb') as cache_file:
+                    bnews_content_cache['entries'] = pickle.load(cache_file)
+
+            except Exception:
+                logger.warn('`pelican-bnews` failed to load content cache [' + str(bnews_settings['content-cache']) + ']')
+
+    entry = bnews_content_cache['entries'].get(content_key)
+    if entry is None:
+        return None
+
+    for overlay, fingerprint in entry['listings']:
+        if get_listing_fingerprint(content_settings.new_child(dict(overlay))) != fingerprint:
+            return None
+
+    bnews_content_cache['used'][content_key] = entry
+
+    return entry
+
+
+def store_cached_content(content_key, content, content_settings, listing_overlays):
+    """
+    Store rendered content into the content cache
+    :param content_key: content cache key
+    :param content: content object
+    :param content_settings: content settings mapping
+    :param listing_overlays: div level settings of the listings used in the content
+    """
+
+    listings = []
+    for overlay in listing_overlays:
+        listings.append((overlay, get_listing_fingerprint(content_settings.new_child(dict(overlay)))))
+
+    bnews_content_cache['used'][content_key] = {
+        'content': content._content,
+        'bnews': content.bnews,
+        'show': content_settings['show'],
+        'listings': listings
+    }
+
+
+def save_content_cache():
+    """
+    Store content cache for the next build, only entries used in this build are kept
+
+    """
+
+    if bnews_settings['content-cache'] and bnews_content_cache['used']:
+        if not os.path.exists(os.path.dirname(bnews_settings['content-cache'])):
+            os.makedirs(os.path.dirname(bnews_settings['content-cache']))
+
+        with open(bnews_settings['content-cache'], 'wb') as cache_file:
+            pickle.dump(bnews_content_cache['used'], cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    bnews_content_cache['entries'] = bnews_content_cache['used']
+    bnews_content_cache['used'] = {}
+
+
+def inject_resources(content, settings):
+    """
+    Add CSS and JS includes to the content metadata
+    :param content: content object
+    :param settings: content settings mapping
+    """
+
+    includes = get_asset_includes(settings)
+
+    for field in [u'scripts', u'styles']:
+        if field not in content.metadata:
+            content.metadata[field] = []
+
+        existing = set(content.metadata[field])
+        for element in includes[field]:
+            if element not in existing:
+                content.metadata[field].append(element)
+                existing.add(element)
+
+
+def get_asset_includes(settings):
+    """
+    Get CSS and JS include tags, computed once per build for each asset setup
+    :param settings: settings mapping
+    :return: dict with scripts and styles
+    """
+
+    include_key = (
+        settings['site-url'],
+        settings['minified'],
+        settings['date-script'],
+        settings['date-format'] == 'absolute',
+        settings['inline-script'],
+        settings['bundle'],
+        settings['json-feed']
+    )
+
+    if include_key not in bnews_assets['includes']:
+        if settings['minified']:
+            js_file = 'bnews.min.js'
+            css_file = 'bnews.min.css'
+
+        else:
+            js_file = 'bnews.js'
+            css_file = 'bnews.css'
+
+        if (not settings['date-script'] or settings['date-format'] == 'absolute') and not settings['json-feed']:
+            # Listings loaded from json feeds need the script also without relative times
+            scripts = ()
+
+        elif settings['inline-script']:
+            scripts = ('<script type="text/javascript">' + get_inline_script(js_file) + '</script>',)
+
+        elif settings['bundle']:
+            scripts = ('<script type="text/javascript" src="' + settings['site-url'] + '/theme/js/' + get_bundle('js', settings['minified'])[0] + '" defer></script>',)
+
+        else:
+            scripts = ('<script type="text/javascript" src="' + settings['site-url'] + '/theme/js/' + js_file + '" defer></script>',)
+
+        if settings['bundle']:
+            css_file = get_bundle('css', settings['minified'])[0]
+
+        bnews_assets['includes'][include_key] = {
+            u'scripts': scripts,
+            u'styles': ('<link rel="stylesheet" href="' + settings['site-url'] + '/theme/css/' + css_file + '">',)
+        }
+
+    return bnews_assets['includes'][include_key]
+
+
+def get_bundle(kind, minified):
+    """
+    Get combined plugin JS or CSS, file name is fingerprinted with the content hash
+    :param kind: js or css
+    :param minified: use minified sources
+    :return: file name, bundle content
+    """
+
+    if (kind, minified) not in bnews_assets['bundles']:
+        prepare_resources()
+        source_path = get_resource_dir(kind + '.min' if minified else kind)
+
+        parts = []
+        for source_file in sorted(os.listdir(source_path)):
+            if source_file.endswith('.' + kind):
+                with open(os.path.join(source_path, source_file), encoding='utf-8') as bundle_part:
+                    parts.append(bundle_part.read().strip())
+
+        bundle = '\n'.join(parts) + '\n'
+        fingerprint = hashlib.md5(bundle.encode('utf-8')).hexdigest()[:12]
+        if minified:
+            bundle_file = 'bnews.bundle.' + fingerprint + '.min.' + kind
+
+        else:
+            bundle_file = 'bnews.bundle.' + fingerprint + '.' + kind
+
+        bnews_assets['bundles'][(kind, minified)] = (bundle_file, bundle)
+
+    return bnews_assets['bundles'][(kind, minified)]
+
+
+def write_bundles(output_path):
+    """
+    Write JS and CSS bundles into output folder, existing bundle files are unchanged as names follow the content
+    :param output_path: output folder
+    :return: list of bundle paths
+    """
+
+    targets = []
+    for kind in ['js', 'css']:
+        bundle_file, bundle = get_bundle(kind, bnews_settings['minified'])
+        target_dir = os.path.join(output_path, 'theme', kind)
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir)
+
+        target = os.path.join(target_dir, bundle_file)
+        if not os.path.isfile(target):
+            with open(target, 'w', encoding='utf-8') as target_file:
+                target_file.write(bundle)
+
+        targets.append(target)
+
+    return targets
+
+
+def get_inline_script(js_file):
+    """
+    Get script source for inlining into the page, read once per build
+    :param js_file: script file name
+    :return: str
+    """
+
+    if js_file not in bnews_inline_scripts:
+        prepare_resources()
+        js_path = os.path.join(get_resource_dir('js.min' if js_file.endswith('.min.js') else 'js'), js_file)
+
+        with open(js_path, encoding='utf-8') as script_file:
+            bnews_inline_scripts[js_file] = script_file.read().strip()
+
+    return bnews_inline_scripts[js_file]
+
+
+def bnews(content):
+    """
+    Main processing
+
+    """
+
+    from pelican.contents import Static
+
+    if isinstance(content, Static):
+        return
+
+    settings = get_content_settings(content.metadata)
+
+    if settings['prescan'] and not has_bnews_markers(content, settings):
+        # Nothing to inject, leave content untouched
+        content.bnews = None
+        bnews_stats['skipped'] += 1
+        return
+
+    bnews_stats['processed'] += 1
+
+    if settings['deferred'] or settings['processes'] > 1:
+        # Rendered in one pass once all generators have finished and article listing is complete
+        content.bnews = None
+        bnews_pending.append((content, settings))
+        return
+
+    render_content_object(content, settings)
+
+
+def render_content_object(content, settings):
+    """
+    Render listings into the content and profile it
+    :param content: content object
+    :param settings: content settings mapping
+    """
+
+    with profile('content') as timer:
+        process_content(content, settings)
+
+    if settings['profile']:
+        bnews_profile['contents'].append((timer.elapsed, getattr(content, 'source_path', None)))
+
+
+def process_content(content, settings):
+    """
+    Render listings into the content
+    :param content: content object
+    :param settings: content settings mapping
+    """
+
+    content_key = None
+    if settings['content-cache']:
+        content_key = get_content_key(content, settings)
+        entry = get_cached_content(content_key, settings)
+        if entry:
+            bnews_stats['content_cache_hits'] += 1
+            apply_rendered_content(content, settings, entry['content'], entry['bnews'], entry['show'])
+            return
+
+        bnews_stats['content_cache_misses'] += 1
+
+    html, bnews_html, show, listing_overlays = render_content(
+        html=content._content,
+        settings=settings,
+        title=getattr(content, 'title', None)
+    )
+
+    apply_rendered_content(content, settings, html, bnews_html, show)
+
+    if content_key:
+        store_cached_content(content_key, content, settings, listing_overlays)
+
+
+def apply_rendered_content(content, settings, html, bnews_html, show):
+    """
+    Store rendered content into the content object
+    :param content: content object
+    :param settings: content settings mapping
+    :param html: rendered content
+    :param bnews_html: rendered listing for template variable
+    :param show: listings were rendered
+    """
+
+    if content._content != html:
+        content._content = html
+
+        # Drop content memoized before listings were rendered
+        for method in ['get_content', 'get_summary']:
+            cache = getattr(getattr(content, method, None), 'cache', None)
+            if cache:
+                for key in [key for key in cache if key[0] is content]:
+                    del cache[key]
+
+    if bnews_html:
+        # Identical listings share a single string object
+        fragment_id = hashlib.md5(bnews_html.encode('utf-8')).hexdigest()[:16]
+        bnews_html = bnews_fragments.setdefault(fragment_id, bnews_html)
+
+        if settings['fragments']:
+            content.bnews_fragment = settings['site-url'] + '/' + get_fragment_path(fragment_id)
+
+    content.bnews = bnews_html
+
+    if show:
+        settings['show'] = True
+        inject_resources(content, settings)
+
+
+def get_fragment_path(fragment_id):
+    """
+    Get fragment file path relative to output folder
+    :param fragment_id: fragment id
+    :return: str
+    """
+
+    return 'theme/bnews/' + fragment_id + '.html'
+
+
+def write_fragments(output_path):
+    """
+    Write rendered template variable listings into fragment files, each distinct listing is written once
+    :param output_path: output folder
+    """
+
+    for fragment_id, fragment in bnews_fragments.items():
+        fragment_path = os.path.join(output_path, *get_fragment_path(fragment_id).split('/'))
+        if os.path.isfile(fragment_path):
+            continue
+
+        if not os.path.exists(os.path.dirname(fragment_path)):
+            os.makedirs(os.path.dirname(fragment_path))
+
+        with open(fragment_path, 'w', encoding='utf-8') as fragment_file:
+            fragment_file.write(fragment)
+
+
+def render_content(html, settings, title=None):
+    """
+    Render listings into html content
+    :param html: raw content
+    :param settings: content settings mapping
+    :param title: content title, used in debug output
+    :return: tuple of rendered content, rendered listing for template variable, show flag, div level settings of rendered listings
+    """
+
+    settings = settings.new_child()
+    with profile('html-parse'):
+        placeholders = find_placeholders(html)
+
+    # Div level settings of the rendered listings, used to validate cached content
+    listing_overlays = []
+
+    bnews_html = None
+    if settings['template-variable']:
+        # We have page variable set
+        settings['show'] = True
+        bnews_html = get_listing(settings=settings.new_child()) or None
+        listing_overlays.append({})
+
+    # Rendered listings by placeholder start offset, spliced into the document at the end
+    listings = {}
+
+    bnews_divs = [placeholder for placeholder in placeholders if placeholder['class'] == 'bnews']
+    bnews_micro_divs = [placeholder for placeholder in placeholders if placeholder['class'] == 'bnews-micro']
+
+    if bnews_divs:
+        if settings['debug_processing']:
+            logger.debug(msg='[{plugin_name}] title:[{title}] divs:[{div_count}]'.format(
+                plugin_name='bnews',
+                title=title,
+                div_count=len(bnews_divs)
+            ))
+
+        # We have divs
+        settings['show'] = True
+        for bnews_div in bnews_divs:
+            div_settings = get_div_settings(bnews_div['attrs'], settings)
+            if get_attribute(bnews_div['attrs'], 'source'):
+                # Micro news merged with the article listing
+                div_settings['data_source'] = get_attribute(bnews_div['attrs'], 'source')
+
+            listing_overlays.append(dict(div_settings.maps[0]))
+
+            listings[bnews_div['start']] = get_listing(settings=div_settings)
+
+    if bnews_micro_divs:
+        if settings['debug_processing']:
+            logger.debug(msg='[{plugin_name}] title:[{title}] divs:[{div_count}]'.format(
+                plugin_name='bnews-micro',
+                title=title,
+                div_count=len(bnews_micro_divs)
+            ))
+
+        # We have divs for micro news
+        settings['show'] = True
+        for bnews_micro_div in bnews_micro_divs:
+            div_settings = get_div_settings(bnews_micro_div['attrs'], settings)
+            div_settings['data_source'] = get_attribute(bnews_micro_div['attrs'], 'source', None)
+            div_settings['include-articles'] = False
+            listing_overlays.append(dict(div_settings.maps[0]))
+
+            listings[bnews_micro_div['start']] = get_listing(settings=div_settings)
+
+    if placeholders:
+        with profile('html-serialize'):
+            # Rest of the document is kept as is
+            parts = []
+            position = 0
+            for placeholder in placeholders:
+                parts.append(html[position:placeholder['start']])
+                parts.append(listings[placeholder['start']])
+                position = placeholder['end']
+
+            parts.append(html[position:])
+            html = ''.join(parts)
+
+    return html, bnews_html, settings['show'], listing_overlays
+
+
+def init_worker(settings, articles):
+    """
+    Initialize worker process for parallel rendering
+    :param settings: global settings without article listing
+    :param articles: list of ArticleRecord
+    """
+
+    bnews_settings.update(settings)
+    bnews_settings['articles'] = articles
+    bnews_listings['articles'] = articles
+    bnews_listings['records'] = articles
+    bnews_listings['category-index'] = build_category_index(articles)
+    bnews_listings['date-ordered'] = check_date_order(articles)
+    bnews_listings['cache'].clear()
+
+
+def render_worker(task):
+    """
+    Render single content in worker process
+    :param task: tuple of raw content, content level settings and title
+    :return: result of render_content, json feeds used in the content, profiled stages, counters and content
+    render time
+    """
+
+    html, overlay, title = task
+    settings = collections.ChainMap(dict(overlay), types.MappingProxyType(bnews_settings))
+
+    # Json feeds, profiled stages and counters of this content are sent back with the result
+    bnews_feeds.clear()
+    bnews_profile['stages'] = {}
+    for field in bnews_stats:
+        bnews_stats[field] = 0
+
+    with profile('content') as timer:
+        result = render_content(html=html, settings=settings, title=title)
+
+    return result + (dict(bnews_feeds), bnews_profile['stages'], dict(bnews_stats), getattr(timer, 'elapsed', None))
+
+
+def merge_profile(stages, stats):
+    """
+    Add profiled stages and counters of a worker process
+    :param stages: profiled stages
+    :param stats: counters
+    """
+
+    for stage, (calls, elapsed) in stages.items():
+        total = bnews_profile['stages'].setdefault(stage, [0, 0.0])
+        total[0] += calls
+        total[1] += elapsed
+
+    for field, value in stats.items():
+        bnews_stats[field] += value
+
+
+def render_pending(generators):
+    """
+    Render deferred content in one pass, with more than one process a process pool is used and article listing
+    is sent once to each worker
+
+    """
+
+    if not bnews_pending:
+        return
+
+    # Listed articles rendered in this pass keep the summary of their source content
+    pending_ids = set(id(content) for content, settings in bnews_pending)
+    for record in bnews_listings['records']:
+        if record._article is not None and id(record._article) in pending_ids:
+            record.detach()
+
+    if bnews_settings['micro-news-streaming']:
+        # Sources are streamed once for the largest listing count of the pass
+        counts = [settings['count'] for content, settings in bnews_pending]
+        for content, settings in bnews_pending:
+            counts.extend(int(count) for count in count_attribute_pattern.findall(content._content))
+
+        bnews_micro_news['stream-limit'] = max(counts)
+
+    if bnews_settings['processes'] <= 1:
+        for content, settings in bnews_pending:
+            render_content_object(content, settings)
+
+        del bnews_pending[:]
+        return
+
+    pending = []
+    for content, settings in bnews_pending:
+        if settings['content-cache']:
+            content_key = get_content_key(content, settings)
+            entry = get_cached_content(content_key, settings)
+            if entry:
+                bnews_stats['content_cache_hits'] += 1
+                apply_rendered_content(content, settings, entry['content'], entry['bnews'], entry['show'])
+                continue
+
+            bnews_stats['content_cache_misses'] += 1
+            pending.append((content, settings, content_key))
+
+        else:
+            pending.append((content, settings, None))
+
+    del bnews_pending[:]
+
+    if not pending:
+        return
+
+    import multiprocessing
+
+    worker_settings = dict((field, value) for field, value in bnews_settings.items() if field != 'articles')
+    articles = bnews_listings['records'] if bnews_settings['articles'] else []
+    tasks = [(content._content, dict(settings.maps[0]), getattr(content, 'title', None)) for content, settings, content_key in pending]
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Workers use the plugin module as loaded by Pelican
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    with context.Pool(
+            processes=bnews_settings['processes'],
+            initializer=init_worker,
+            initargs=(worker_settings, articles)) as pool:
+        with profile('parallel-render'):
+            results = pool.map(render_worker, tasks, chunksize=max(1, len(tasks) // (bnews_settings['processes'] * 4)))
+
+    for (content, settings, content_key), result in zip(pending, results):
+        html, bnews_html, show, listing_overlays, feeds, stages, stats, elapsed = result
+        apply_rendered_content(content, settings, html, bnews_html, show)
+        bnews_feeds.update(feeds)
+        merge_profile(stages, stats)
+
+        if settings['profile']:
+            bnews_profile['contents'].append((elapsed, getattr(content, 'source_path', None)))
+
+        if content_key:
+            store_cached_content(content_key, content, settings, listing_overlays)
+
+
+def process_page_metadata(generator, metadata):
+    """
+    Process page metadata and assign css
+
+    """
+
+    if u'styles' not in metadata:
+        metadata[u'styles'] = []
+
+    if u'scripts' not in metadata:
+        metadata[u'scripts'] = []
+
+
+@profiled('resources')
+def move_resources(gen):
+    """
+    Move files from css folders to output folder, use minified files.
+
+    """
+
+    prepare_resources()
+
+    if bnews_settings['bundle']:
+        targets = write_bundles(gen.output_path)
+
+    else:
+        suffix = '.min' if bnews_settings['minified'] else ''
+
+        targets = []
+        for kind in ['css', 'js']:
+            target_dir = os.path.join(gen.output_path, 'theme', kind)
+            if not os.path.exists(target_dir):
+                os.makedirs(target_dir)
+
+            resource_file = 'bnews' + suffix + '.' + kind
+            source = os.path.join(get_resource_dir(kind + suffix), resource_file)
+            target = os.path.join(target_dir, resource_file)
+            if os.path.isfile(source):
+                copy_resource(source, target)
+
+            targets.append(target)
+
+    if bnews_settings['precompress']:
+        precompress_resources(targets)
+
+
+def prepare_resources():
+    """
+    Generate minified resources once per build, before they are bundled, inlined or copied
+
+    """
+
+    if not bnews_assets['prepared']:
+        bnews_assets['prepared'] = True
+        if bnews_settings['minified'] and bnews_settings['generate_minified']:
+            minify_css_directory(plugin_paths=bnews_assets['plugin-paths'], source='css', target='css.min')
+            minify_js_directory(plugin_paths=bnews_assets['plugin-paths'], source='js', target='js.min')
+
+
+def get_resource_dir(folder):
+    """
+    Get plugin resource folder, first plugin path with the plugin folder is used and plugin module folder otherwise
+    :param folder: resource folder name, e.g. js.min
+    :return: path
+    """
+
+    for path in bnews_assets['plugin-paths']:
+        resource_dir = os.path.join(path, 'pelican-bnews', folder)
+        if os.path.isdir(resource_dir):
+            return resource_dir
+
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), folder)
+
+
+def precompress_resources(targets):
+    """
+    Write gzip and brotli compressed siblings of the resource files with maximum compression, to be served as is
+    by the web server. Files are compressed again only when their content changes.
+    :param targets: list of resource paths
+    """
+
+    import gzip
+
+    try:
+        import brotli
+
+    except ImportError:
+        # Brotli is optional, only gzip files are written
+        brotli = None
+
+    manifest = {}
+    if os.path.isfile(bnews_settings['precompress']):
+        try:
+            with open(bnews_settings['precompress'], encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+
+        except ValueError:
+            logger.warn('`pelican-bnews` failed to load compressed resource manifest [' + str(bnews_settings['precompress']) + ']')
+
+    modified = False
+    for target in targets:
+        if not os.path.isfile(target):
+            continue
+
+        with open(target, 'rb') as target_file:
+            data = target_file.read()
+
+        digest = hashlib.md5(data).hexdigest()
+        compressed = {target + '.gz': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli:
+            compressed[target + '.br'] = lambda: brotli.compress(data, quality=11)
+
+        if manifest.get(target) == digest and all(os.path.isfile(path) for path in compressed):
+            continue
+
+        for path, compress in compressed.items():
+            with open(path, 'wb') as compressed_file:
+                compressed_file.write(compress())
+
+        manifest[target] = digest
+        modified = True
+
+    if modified:
+        if not os.path.exists(os.path.dirname(bnews_settings['precompress'])):
+            os.makedirs(os.path.dirname(bnews_settings['precompress']))
+
+        with open(bnews_settings['precompress'], 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def is_up_to_date(source, target):
+    """
+    Check whether target file was written after source file was last modified
+    :param source: source path
+    :param target: target path
+    :return: bool
+    """
+
+    return os.path.isfile(target) and os.path.getmtime(target) >= os.path.getmtime(source)
+
+
+def copy_resource(source, target):
+    """
+    Copy or link resource file to output folder, skipped when target is up to date.
+    :param source: source path
+    :param target: target path
+    """
+
+    if os.path.isfile(target):
+        if os.path.samefile(source, target):
+            return
+
+        source_stat = os.stat(source)
+        target_stat = os.stat(target)
+        if source_stat.st_size == target_stat.st_size and source_stat.st_mtime == target_stat.st_mtime:
+            return
+
+        os.remove(target)
+
+    if bnews_settings['link-resources']:
+        try:
+            os.link(source, target)
+            return
+
+        except OSError:
+            # Linking not possible, e.g. across file systems
+            pass
+
+    shutil.copy2(source, target)
+
+
+def minify_css_directory(plugin_paths, source, target):
+    """
+    Move CSS resources from source directory to target directory and minify. Using rcssmin.
+
+    """
+
+    import rcssmin
+
+    for path in plugin_paths:
+        source_ = os.path.join(path, 'pelican-bnews', source)
+        target_ = os.path.join(path, 'pelican-bnews', target)
+        if os.path.isdir(source_):
+            if not os.path.exists(target_):
+                os.makedirs(target_)
+
+            for root, dirs, files in os.walk(source_):
+                for current_file in files:
+                    if current_file.endswith(".css"):
+                        current_file_path = os.path.join(root, current_file)
+                        minified_file_path = os.path.join(target_, current_file.replace('.css', '.min.css'))
+                        if is_up_to_date(current_file_path, minified_file_path):
+                            continue
+
+                        with open(current_file_path, encoding="utf-8") as css_file:
+                            with open(minified_file_path, "w", encoding="utf-8") as minified_file:
+                                minified_file.write(rcssmin.cssmin(css_file.read(), keep_bang_comments=True))
+
+
+def minify_js_directory(plugin_paths, source, target):
+    """
+    Move JS resources from source directory to target directory and minify.
+
+    """
+
+    from jsmin import jsmin
+
+    for path in plugin_paths:
+        source_ = os.path.join(path, 'pelican-bnews', source)
+        target_ = os.path.join(path, 'pelican-bnews', target)
+
+        if os.path.isdir(source_):
+            if not os.path.exists(target_):
+                os.makedirs(target_)
+
+            for root, dirs, files in os.walk(source_):
+                for current_file in files:
+                    if current_file.endswith(".js"):
+                        current_file_path = os.path.join(root, current_file)
+                        minified_file_path = os.path.join(target_, current_file.replace('.js', '.min.js'))
+                        if is_up_to_date(current_file_path, minified_file_path):
+                            continue
+
+                        with open(current_file_path, encoding="utf-8") as js_file:
+                            with open(minified_file_path, "w", encoding="utf-8") as minified_file:
+                                minified_file.write(jsmin(js_file.read()))
+
+
+def get_articles(generator):
+    """
+    Fetch article listing
+
+    """
+
+    set_articles(generator.articles)
+    move_resources(generator)
+
+
+def set_articles(articles):
+    """
+    Set article listing used in listings
+    :param articles: list of pelican articles
+    """
+
+    bnews_settings['articles'] = articles
+    bnews_listings['articles'] = articles
+    bnews_listings['records'] = get_records(articles)
+    bnews_listings['category-index'] = build_category_index(bnews_listings['records'])
+    bnews_listings['date-ordered'] = check_date_order(bnews_listings['records'])
+
+    # Article set changed, drop listings rendered against the previous one
+    bnews_listings['version'] += 1
+    bnews_listings['cache'].clear()
+    bnews_listings['fingerprints'] = {}
+    bnews_content_cache['settings-key'] = None
+
+    bnews_dates['now'] = datetime.datetime.now()
+    bnews_dates['formatted'] = {}
+
+
+def init_default_config(pelican):
+    """
+    Handle settings from pelicanconf.py
+
+    """
+
+    global bnews_default_settings, bnews_settings
+
+    bnews_default_settings['site-url'] = pelican.settings['SITEURL']
+    if 'BNEWS_HEADER' in pelican.settings:
+        bnews_default_settings['header'] = pelican.settings['BNEWS_HEADER']
+
+    if 'BNEWS_HEADER_LINK' in pelican.settings:
+        bnews_default_settings['header-link'] = pelican.settings['BNEWS_HEADER_LINK']
+
+    if 'BNEWS_TEMPLATE' in pelican.settings:
+        bnews_default_settings['template'].update(pelican.settings['BNEWS_TEMPLATE'])
+
+    if 'BNEWS_ITEM_TEMPLATE' in pelican.settings:
+        bnews_default_settings['item-template'].update(pelican.settings['BNEWS_ITEM_TEMPLATE'])
+
+    if 'BNEWS_PANEL_COLOR' in pelican.settings:
+        bnews_default_settings['panel-color'] = pelican.settings['BNEWS_PANEL_COLOR']
+
+    if 'BNEWS_CATEGORY_LABEL_CSS' in pelican.settings:
+        bnews_default_settings['category-label-css'] = pelican.settings['BNEWS_CATEGORY_LABEL_CSS']
+
+    if 'BNEWS_MINIFIED' in pelican.settings:
+        bnews_default_settings['minified'] = pelican.settings['BNEWS_MINIFIED']
+
+    if 'BNEWS_GENERATE_MINIFIED' in pelican.settings:
+        bnews_default_settings['generate_minified'] = pelican.settings['BNEWS_GENERATE_MINIFIED']
+
+    if 'BNEWS_PRESCAN' in pelican.settings:
+        bnews_default_settings['prescan'] = pelican.settings['BNEWS_PRESCAN']
+
+    if pelican.settings.get('BNEWS_TEMPLATE_BYTECODE_CACHE'):
+        bnews_default_settings['template-bytecode-cache'] = os.path.join(pelican.settings['CACHE_PATH'], 'bnews-templates')
+
+    if 'BNEWS_NORMALIZE_HTML' in pelican.settings:
+        bnews_default_settings['normalize-html'] = pelican.settings['BNEWS_NORMALIZE_HTML']
+
+    if 'BNEWS_LISTING_CACHE_SIZE' in pelican.settings:
+        bnews_default_settings['listing-cache-size'] = int(pelican.settings['BNEWS_LISTING_CACHE_SIZE'])
+
+    if pelican.settings.get('BNEWS_MICRO_NEWS_CACHE'):
+        bnews_default_settings['micro-news-cache'] = os.path.join(pelican.settings['CACHE_PATH'], 'bnews-micro-news.pickle')
+
+    if 'BNEWS_MICRO_NEWS_STREAMING' in pelican.settings:
+        bnews_default_settings['micro-news-streaming'] = pelican.settings['BNEWS_MICRO_NEWS_STREAMING']
+
+    if 'BNEWS_LINK_RESOURCES' in pelican.settings:
+        bnews_default_settings['link-resources'] = pelican.settings['BNEWS_LINK_RESOURCES']
+
+    if 'BNEWS_JSON_FEED' in pelican.settings:
+        bnews_default_settings['json-feed'] = pelican.settings['BNEWS_JSON_FEED']
+
+    if pelican.settings.get('BNEWS_CONTENT_CACHE') and not bnews_default_settings['json-feed']:
+        # With json feeds content does not depend on the articles and is not cached
+        bnews_default_settings['content-cache'] = os.path.join(pelican.settings['CACHE_PATH'], 'bnews-content.pickle')
+
+    if 'BNEWS_PROCESSES' in pelican.settings:
+        import multiprocessing
+        bnews_default_settings['processes'] = int(pelican.settings['BNEWS_PROCESSES'] or multiprocessing.cpu_count())
+
+    if 'BNEWS_SUMMARY_MAX_CHARS' in pelican.settings:
+        bnews_default_settings['summary-max-chars'] = pelican.settings['BNEWS_SUMMARY_MAX_CHARS']
+
+    if 'BNEWS_DEFERRED' in pelican.settings:
+        bnews_default_settings['deferred'] = pelican.settings['BNEWS_DEFERRED']
+
+    if bnews_default_settings['json-feed']:
+        # Feeds are shared by all content and built from the complete article set
+        bnews_default_settings['deferred'] = True
+
+    if 'BNEWS_FRAGMENTS' in pelican.settings:
+        bnews_default_settings['fragments'] = pelican.settings['BNEWS_FRAGMENTS']
+
+    if 'BNEWS_INLINE_SCRIPT' in pelican.settings:
+        bnews_default_settings['inline-script'] = pelican.settings['BNEWS_INLINE_SCRIPT']
+
+    if 'BNEWS_BUNDLE' in pelican.settings:
+        bnews_default_settings['bundle'] = pelican.settings['BNEWS_BUNDLE']
+
+    if pelican.settings.get('BNEWS_PRECOMPRESS'):
+        bnews_default_settings['precompress'] = os.path.join(pelican.settings['CACHE_PATH'], 'bnews-compressed.json')
+
+    if 'BNEWS_DATE_FORMAT' in pelican.settings:
+        bnews_default_settings['date-format'] = pelican.settings['BNEWS_DATE_FORMAT']
+
+    bnews_default_settings['date-locale'] = pelican.settings.get('BNEWS_DATE_LOCALE', pelican.settings.get('DEFAULT_LANG', 'en'))
+
+    if 'BNEWS_DATE_SCRIPT' in pelican.settings:
+        bnews_default_settings['date-script'] = pelican.settings['BNEWS_DATE_SCRIPT']
+
+    if 'BNEWS_PROFILE' in pelican.settings:
+        bnews_default_settings['profile'] = pelican.settings['BNEWS_PROFILE']
+
+    if 'BNEWS_PROFILE_REPORT' in pelican.settings:
+        bnews_default_settings['profile-report'] = pelican.settings['BNEWS_PROFILE_REPORT']
+
+    if 'BNEWS_DEBUG_PROCESSING' in pelican.settings:
+        bnews_default_settings['debug_processing'] = pelican.settings['BNEWS_DEBUG_PROCESSING']
+
+    bnews_settings = copy.deepcopy(bnews_default_settings)
+
+    bnews_templates['environment'] = None
+    bnews_templates['sources'] = {}
+    bnews_templates['compiled'] = {}
+
+    bnews_listings['cache'].clear()
+    bnews_listings['fingerprints'] = {}
+
+    bnews_micro_news['sources'] = {}
+    bnews_micro_news['stream-limit'] = 0
+    bnews_micro_news['sidecar-loaded'] = False
+    bnews_micro_news['modified'] = False
+
+    bnews_content_cache['entries'] = {}
+    bnews_content_cache['used'] = {}
+    bnews_content_cache['loaded'] = False
+    bnews_content_cache['settings-key'] = None
+
+    del bnews_pending[:]
+    bnews_fragments.clear()
+    bnews_feeds.clear()
+    bnews_inline_scripts.clear()
+    bnews_assets['plugin-paths'] = pelican.settings.get('PLUGIN_PATHS', [])
+    bnews_assets['prepared'] = False
+    bnews_assets['includes'] = {}
+    bnews_assets['bundles'] = {}
+
+    bnews_dates['now'] = datetime.datetime.now()
+    bnews_dates['formatted'] = {}
+
+    bnews_profile['stages'] = {}
+    bnews_profile['contents'] = []
+
+    for field in bnews_stats:
+        bnews_stats[field] = 0
+
+
+def finalize(pelican):
+    """
+    Store caches and report processing counters
+
+    """
+
+    if bnews_settings['fragments']:
+        write_fragments(pelican.output_path)
+
+    # Next build, e.g. with autoreload, collects its own fragments
+    bnews_fragments.clear()
+
+    if bnews_settings['json-feed']:
+        write_feeds(pelican.output_path)
+
+    # Next build, e.g. with autoreload, publishes its own feeds
+    bnews_feeds.clear()
+
+    # Resources may change between builds, minified again and read on first use
+    bnews_assets['prepared'] = False
+    bnews_assets['includes'] = {}
+    bnews_assets['bundles'] = {}
+    bnews_inline_scripts.clear()
+
+    save_micro_news_sidecar()
+    save_content_cache()
+    report_stats(pelican)
+
+    if bnews_settings['profile']:
+        report_profile(pelican)
+
+
+def report_stats(pelican):
+    """
+    Report processing counters
+
+    """
+
+    logger.debug(msg='[{plugin_name}] processed:[{processed}] skipped:[{skipped}] listing cache hits:[{hits}] misses:[{misses}] content cache hits:[{content_hits}] misses:[{content_misses}]'.format(
+        plugin_name='bnews',
+        processed=bnews_stats['processed'],
+        skipped=bnews_stats['skipped'],
+        hits=bnews_stats['listing_cache_hits'],
+        misses=bnews_stats['listing_cache_misses'],
+        content_hits=bnews_stats['content_cache_hits'],
+        content_misses=bnews_stats['content_cache_misses']
+    ))
+
+
+def report_profile(pelican):
+    """
+    Report time spent in processing stages, and write optional json report
+
+    """
+
+    stages = sorted(bnews_profile['stages'].items(), key=lambda item: item[1][1], reverse=True)
+    contents = sorted(bnews_profile['contents'], key=lambda item: item[0], reverse=True)
+
+    lines = ['[bnews] profile', '{:<20} {:>10} {:>12} {:>12}'.format('stage', 'calls', 'total [s]', 'per call [ms]')]
+    for stage, (calls, elapsed) in stages:
+        lines.append('{:<20} {:>10} {:>12.3f} {:>12.3f}'.format(stage, calls, elapsed, elapsed / calls * 1000.0))
+
+    if 'parallel-render' in bnews_profile['stages']:
+        lines.append('worker stages are summed over processes and overlap parallel-render')
+
+    for field in sorted(bnews_stats):
+        lines.append('{:<20} {:>10}'.format(field, bnews_stats[field]))
+
+    if contents:
+        lines.append('slowest content:')
+        for elapsed, source_path in contents[:10]:
+            lines.append('{:>12.3f} ms  {}'.format(elapsed * 1000.0, source_path))
+
+    logger.info('\n'.join(lines))
+
+    if bnews_settings['profile-report']:
+        with open(bnews_settings['profile-report'], 'w', encoding='utf-8') as report_file:
+            report_file.write(str(json.dumps({
+                'stages': dict((stage, {'calls': calls, 'total': elapsed}) for stage, (calls, elapsed) in stages),
+                'counters': bnews_stats,
+                'contents': [{'source_path': source_path, 'time': elapsed} for elapsed, source_path in contents]
+            }, indent=2)))
 
 
 def register():
@@ -667,4 +2655,6 @@ def register():
     signals.article_generator_finalized.connect(get_articles)
 
     signals.content_object_init.connect(bnews)
+    signals.all_generators_finalized.connect(render_pending)
+    signals.finalized.connect(finalize)
 
@@ -1 +1,17 @@
-$(document).ready(function(){var timeagoInstance=timeago();var nodes=document.querySelectorAll('.bnews-time');timeagoInstance.render(nodes);timeago.cancel();});
\ No newline at end of file
+(function(){'use strict';var units=[['year',31536000],['month',2592000],['week',604800],['day',86400],['hour',3600],['minute',60],['second',1]];var formatter=null;if(window.Intl&&Intl.RelativeTimeFormat){formatter=new Intl.RelativeTimeFormat(document.documentElement.lang||undefined,{numeric:'auto'});}
+function format(value,unit){if(formatter){return formatter.format(value,unit);}
+var count=Math.abs(value);var label=count+' '+unit+(count===1?'':'s');return value<0?label+' ago':'in '+label;}
+function render(node){var value=node.getAttribute('datetime');if(!value){return;}
+var date=new Date(value.replace(' ','T'));if(isNaN(date.getTime())){return;}
+var seconds=(date.getTime()-Date.now())/1000;for(var i=0;i<units.length;i++){if(Math.abs(seconds)>=units[i][1]||units[i][0]==='second'){node.textContent=format(Math.round(seconds/units[i][1]),units[i][0]);break;}}}
+var observer=null;if('IntersectionObserver'in window){observer=new IntersectionObserver(function(entries){entries.forEach(function(entry){if(entry.isIntersecting){render(entry.target);observer.unobserve(entry.target);}});});}
+function observe(nodes){for(var i=0;i<nodes.length;i++){if(observer){observer.observe(nodes[i]);}else{render(nodes[i]);}}}
+var feeds={};function load(url,callback){if(!feeds[url]){feeds[url]={data:null,callbacks:[]};var request=new XMLHttpRequest();var failed=function(){delete feeds[url];};request.open('GET',url);request.onload=function(){if(request.status<200||request.status>=300){failed();return;}
+try{feeds[url].data=JSON.parse(request.responseText);}catch(error){failed();return;}
+feeds[url].callbacks.forEach(function(waiting){waiting(feeds[url].data);});feeds[url].callbacks=[];};request.onerror=failed;request.send();}
+if(feeds[url].data){callback(feeds[url].data);}else{feeds[url].callbacks.push(callback);}}
+function hydrate(node){load(node.getAttribute('data-feed'),function(data){var container=document.createElement('div');container.innerHTML=data.html;var nodes=container.querySelectorAll('.bnews-time[data-bnews-relative]');while(container.firstChild){node.parentNode.insertBefore(container.firstChild,node);}
+node.parentNode.removeChild(node);observe(nodes);});}
+function init(){var placeholders=document.querySelectorAll('.bnews-feed[data-feed]');for(var i=0;i<placeholders.length;i++){hydrate(placeholders[i]);}
+observe(document.querySelectorAll('.bnews-time[data-bnews-relative]'));}
+if(document.readyState==='loading'){document.addEventListener('DOMContentLoaded',init);}else{init();}})();
\ No newline at end of file